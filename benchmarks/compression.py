@@ -0,0 +1,73 @@
+# compression.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Save time, load time and size on disk of the synthetic graphs of
+# benchmarks/generators.py for every compression, against plain json.
+# Usage: python -m benchmarks.compression [--shapes chain,...] [--sizes 1000,...] [--repeat N] [--binary]
+
+import argparse
+import os
+import tempfile
+
+from benchmarks.generators import SHAPES
+from benchmarks.suite import best_of
+from nodes.registry import NodeFactory
+from core.compression import Compression
+from core.serializer import Serializer
+from core.node_color import NodeColor
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def bench_graph(graph, repeat, directory, binary):
+    # the snapshot is taken once, like the background saver only gets the data
+    data = Serializer.to_data(graph)
+    results = {}
+    for compression in Compression.NAMES:
+        path = os.path.join(directory, f"graph.{compression}")
+        save = best_of(repeat, lambda: Serializer.write_data(data, path, binary, compression))
+        load = best_of(repeat, lambda: Serializer.load_file(path, NodeFactory))
+        results[compression] = (save, load, os.path.getsize(path))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="compressed against plain project files")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help=f"comma separated, from {', '.join(SHAPES)}")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma separated node counts")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measure, the fastest is kept")
+    parser.add_argument("--binary", action="store_true", help="compress the binary format instead of json")
+    args = parser.parse_args()
+    NodeColor.set_node_colors() # nodes warn about a missing color when created
+
+    with tempfile.TemporaryDirectory() as directory:
+        for shape in [s for s in args.shapes.split(",") if s]:
+            for size in [int(s) for s in args.sizes.split(",") if s]:
+                graph = SHAPES[shape](size)
+                results = bench_graph(graph, max(1, args.repeat), directory, args.binary)
+                plain_save, plain_load, plain_size = results["none"]
+                print(f"{shape:<10} {size:>7} nodes ({'binary' if args.binary else 'json'})")
+                for compression, (save, load, file_size) in results.items():
+                    print(f"{'':<10} {compression:<5} {file_size / 2**20:8.2f} MiB ({file_size / plain_size:5.2f}x)  "
+                          f"save {save * 1e3:9.1f} ms ({save / plain_save:5.2f}x)  "
+                          f"load {load * 1e3:9.1f} ms ({load / plain_load:5.2f}x)", flush=True)
+                del graph
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# connect_edges.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Adds random edges to a graph the same way drag-to-connect does (cycle check, then add_edge)
+# and reports the per-insert cost.
+# Usage: python -m benchmarks.connect_edges [--nodes N] [--edges N] [--seed N] [--dfs]
+
+import argparse
+import random
+import time
+
+from core.graph import Graph, Node
+from core.port_types import PortType
+from core.validator import GraphValidator
+
+
+def build_nodes(graph, count):
+    nodes = []
+    for i in range(count):
+        node = Node("bench", f"Bench {i}")
+        node.add_input("In", PortType.ANY)
+        node.add_output("Out", PortType.ANY)
+        graph.add_node(node)
+        nodes.append(node)
+    return nodes
+
+
+def run(node_count, edge_count, seed, check):
+    rng = random.Random(seed)
+    graph = Graph()
+    nodes = build_nodes(graph, node_count)
+    timings = []
+    rejected = 0
+    attempts = 0
+
+    while len(graph.edges) < edge_count and attempts < edge_count * 10:
+        attempts += 1
+        source, target = rng.sample(nodes, 2)
+        start = time.perf_counter_ns()
+        if check(graph, source, target):
+            timings.append(time.perf_counter_ns() - start)
+            rejected += 1
+            continue
+        graph.add_edge(source.outputs[0], target.inputs[0])
+        timings.append(time.perf_counter_ns() - start)
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        "edges": len(graph.edges),
+        "rejected": rejected,
+        "total_s": total / 1e9,
+        "mean_us": total / len(timings) / 1e3,
+        "median_us": timings[len(timings) // 2] / 1e3,
+        "p99_us": timings[int(len(timings) * 0.99)] / 1e3,
+    }
+
+
+def dfs_check(graph, source, target):
+    return GraphValidator._can_reach(graph, target, source)
+
+
+def print_result(name, result):
+    print(f"{name:<18} edges={result['edges']} rejected={result['rejected']} "
+          f"total={result['total_s']:.2f}s mean={result['mean_us']:.1f}us "
+          f"median={result['median_us']:.1f}us p99={result['p99_us']:.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-insert cost of connecting edges")
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--edges", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dfs", action="store_true", help="also run the plain reachability DFS for comparison")
+    args = parser.parse_args()
+
+    print_result("topological order", run(args.nodes, args.edges, args.seed, GraphValidator.creates_cycle))
+    if args.dfs:
+        print_result("dfs", run(args.nodes, args.edges, args.seed, dfs_check))
+
+
+if __name__ == "__main__":
+    main()
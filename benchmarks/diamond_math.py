@@ -0,0 +1,90 @@
+# diamond_math.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Emits an Echo fed by a diamond shaped math graph: every level is an Addition whose
+# two inputs are both the previous level. Without memoization a level L graph
+# evaluates 2^(L+1) - 1 nodes per pass.
+# Usage: python -m benchmarks.diamond_math [--levels N] [--budget MiB]
+
+import argparse
+import time
+
+import nodes.flow_nodes
+import nodes.command_nodes
+import nodes.operation_nodes
+from nodes.registry import create_node
+from nodes.operation_nodes import Addition
+from core.graph import Graph
+from core.bash_emitter import BashEmitter
+
+
+def build(levels):
+    graph = Graph()
+    start = create_node("start")
+    echo = create_node("echo")
+    graph.add_node(start)
+    graph.add_node(echo)
+    graph.add_edge(start.outputs[0], echo.inputs[0])
+
+    previous = create_node("number_constant")
+    previous.properties["value"] = 1
+    graph.add_node(previous)
+    for _ in range(levels):
+        addition = create_node("addition")
+        graph.add_node(addition)
+        graph.add_edge(previous.outputs[0], addition.inputs[0])
+        graph.add_edge(previous.outputs[0], addition.inputs[1])
+        previous = addition
+    graph.add_edge(previous.outputs[0], echo.inputs[1])
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emit time of diamond shaped math graphs")
+    parser.add_argument("--levels", type=int, default=30)
+    parser.add_argument("--budget", type=int, default=64, help="largest script to generate, in MiB")
+    args = parser.parse_args()
+
+    evaluations = 0
+    emit_bash_value = Addition.emit_bash_value
+
+    def counted(self, context):
+        nonlocal evaluations
+        evaluations += 1
+        return emit_bash_value(self, context)
+
+    Addition.emit_bash_value = counted
+    try:
+        for level in range(1, args.levels + 1):
+            graph = build(level)
+            evaluations = 0
+            start = time.perf_counter()
+            script = BashEmitter(graph).emit()
+            elapsed = time.perf_counter() - start
+            print(f"level={level:<3} evaluations={evaluations:<4} unmemoized={2 ** level - 1:<11} "
+                  f"script={len(script) / 2**20:.2f}MiB time={elapsed * 1e3:.2f}ms")
+            if len(script) * 2 > args.budget * 2**20:
+                print(f"stopping, the next level would produce more than {args.budget}MiB")
+                break
+    finally:
+        Addition.emit_bash_value = emit_bash_value
+
+
+if __name__ == "__main__":
+    main()
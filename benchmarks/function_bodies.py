@@ -0,0 +1,97 @@
+# function_bodies.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Opening a project whose function bodies are all in the graph file against one that
+# keeps them in their own files (split_functions), with the "library" graphs of
+# benchmarks/generators.py: load time and memory held by the graph, then the time
+# to read every body (what emitting the script needs).
+# Usage: python -m benchmarks.function_bodies [--sizes 10000,...] [--repeat N]
+
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.generators import FUNCTION_COUNT, SHAPES
+from benchmarks.suite import best_of
+from nodes.registry import NodeFactory
+from core.function_store import FunctionStore
+from core.serializer import Serializer
+from core.node_color import NodeColor
+
+DEFAULT_SIZES = (10000, 100000)
+
+
+def memory_of(load):
+    # bytes still allocated once the graph is loaded
+    tracemalloc.start()
+    graph = load()
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del graph
+    return current
+
+
+def bench_graph(graph, repeat, directory):
+    whole_path = Path(directory) / "whole" / "graph.json"
+    split_path = Path(directory) / "split" / "graph.json"
+    whole_path.parent.mkdir(exist_ok=True)
+    split_path.parent.mkdir(exist_ok=True)
+    Serializer.write_data(FunctionStore.snapshot(graph, whole_path)[0], whole_path)
+    data, bodies = FunctionStore.snapshot(graph, split_path, split=True)
+    FunctionStore.write_bodies(split_path, bodies)
+    Serializer.write_data(data, split_path)
+    graph.function_store = None
+
+    def load_whole():
+        return Serializer.load_file(whole_path, NodeFactory)[0]
+
+    def load_split():
+        return Serializer.load_file(split_path, NodeFactory)[0]
+
+    def load_split_all():
+        split = load_split()
+        split.ensure_loaded()
+        return split
+
+    return {
+        "whole": (best_of(repeat, load_whole), memory_of(load_whole)),
+        "split": (best_of(repeat, load_split), memory_of(load_split)),
+        "split, all read": (best_of(repeat, load_split_all), memory_of(load_split_all)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="function bodies in the graph file against in their own files")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma separated node counts")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measure, the fastest is kept")
+    args = parser.parse_args()
+    NodeColor.set_node_colors() # nodes warn about a missing color when created
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in [int(s) for s in args.sizes.split(",") if s]:
+            graph = SHAPES["library"](size)
+            results = bench_graph(graph, max(1, args.repeat), directory)
+            print(f"library {size:>7} nodes, {FUNCTION_COUNT} functions")
+            for name, (seconds, memory) in results.items():
+                print(f"{'':<8} {name:<16} open {seconds * 1e3:9.1f} ms  memory {memory / 2**20:8.2f} MiB", flush=True)
+            del graph
+
+
+if __name__ == "__main__":
+    main()
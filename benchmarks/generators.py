@@ -0,0 +1,177 @@
+# generators.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Synthetic graphs of typical shapes for the benchmarks, each builder returns a
+# graph of about `size` nodes (never less than a handful).
+
+import nodes.flow_nodes
+import nodes.command_nodes
+import nodes.variable_nodes
+import nodes.operation_nodes
+import nodes.utils_node
+from nodes.registry import create_node
+from core.graph import Graph
+
+NEST_DEPTH = 40 # nested blocks are chained after this depth, bash indentation grows with it
+DAG_BLOCK = 256
+FUNCTION_COUNT = 40
+
+
+def _new_graph():
+    graph = Graph()
+    start = create_node("start")
+    graph.add_node(start)
+    return graph, start
+
+
+def _node(graph, node_type, **properties):
+    node = create_node(node_type)
+    node.properties.update(properties)
+    graph.add_node(node)
+    return node
+
+
+def _int_variable(graph, name):
+    # a number the optimizer cannot fold
+    return _node(graph, "number_constant", value=f"${name}")
+
+
+def linear_chain(size):
+    # start -> echo -> echo -> ...
+    graph, previous = _new_graph()
+    for i in range(max(1, size - 1)):
+        echo = _node(graph, "echo", text=f"step {i}")
+        graph.add_edge(previous.outputs[0], echo.inputs[0])
+        previous = echo
+    return graph
+
+
+def wide_sequencer(size):
+    # one sequencer with a step per echo
+    graph, start = _new_graph()
+    sequencer = _node(graph, "sequencer")
+    graph.add_edge(start.outputs[0], sequencer.inputs[0])
+    steps = max(3, size - 2)
+    while len(sequencer.outputs) < steps:
+        sequencer.add_output_dynamic()
+    for i, output in enumerate(sequencer.outputs[:steps]):
+        echo = _node(graph, "echo", text=f"step {i}")
+        graph.add_edge(output, echo.inputs[0])
+    return graph
+
+
+def nested_blocks(size):
+    # If and For loops nested NEST_DEPTH deep, the next tower hangs off the Next of the outermost block
+    graph, start = _new_graph()
+    previous_next = start.outputs[0]
+    depth = 0
+    outer = None
+    while len(graph.nodes) < size:
+        if depth % 2 == 0:
+            block = _node(graph, "if")
+            compare = _node(graph, "less_than")
+            variable = _int_variable(graph, f"v{len(graph.nodes)}")
+            limit = _node(graph, "number_constant", value=str(depth))
+            graph.add_edge(variable.outputs[0], compare.inputs[0])
+            graph.add_edge(limit.outputs[0], compare.inputs[1])
+            graph.add_edge(compare.outputs[0], block.inputs[1])
+        else:
+            block = _node(graph, "for", list="a b c", variable=f"i{depth}")
+        echo = _node(graph, "echo", text=f"depth {depth}")
+        graph.add_edge(previous_next, block.inputs[0])
+        graph.add_edge(block.outputs[0], echo.inputs[0])
+        outer = outer or block
+        depth += 1
+        if depth == NEST_DEPTH:
+            previous_next = outer.outputs[2]
+            outer = None
+            depth = 0
+        else:
+            previous_next = echo.outputs[0]
+    return graph
+
+
+def math_dag(size):
+    # blocks of additions/multiplications, each layer reads two nodes of the layer
+    # before it, and every block is printed by one echo
+    graph, previous = _new_graph()
+    block = 0
+    while len(graph.nodes) < size:
+        layer = [_int_variable(graph, f"x{block}_{i}") for i in range(4)]
+        count = len(layer)
+        while count < DAG_BLOCK and len(graph.nodes) < size:
+            next_layer = []
+            for i in range(len(layer)):
+                node = _node(graph, "addition" if (i + count) % 2 else "multiplication")
+                graph.add_edge(layer[i].outputs[0], node.inputs[0])
+                graph.add_edge(layer[(i + 1) % len(layer)].outputs[0], node.inputs[1])
+                next_layer.append(node)
+            layer = next_layer
+            count += len(layer)
+        echo = _node(graph, "echo")
+        graph.add_edge(previous.outputs[0], echo.inputs[0])
+        graph.add_edge(layer[0].outputs[0], echo.inputs[1])
+        previous = echo
+        block += 1
+    return graph
+
+
+def functions_and_calls(size):
+    # a function with a one echo body per call made from the main chain
+    graph, previous = _new_graph()
+    for i in range(max(1, size // 3)):
+        function = _node(graph, "function", name=f"fn_{i}")
+        body = _node(graph, "echo", text=f"in fn_{i}")
+        graph.add_edge(function.outputs[0], body.inputs[0])
+        call = _node(graph, "call", function=f"fn_{i}")
+        graph.add_edge(previous.outputs[0], call.inputs[0])
+        previous = call
+    return graph
+
+
+def function_library(size):
+    # FUNCTION_COUNT functions with long bodies (echos reading variables), each one in its
+    # own area of the canvas, the main chain calls the first of them
+    graph, start = _new_graph()
+    per_function = max(2, size // FUNCTION_COUNT)
+    for f in range(FUNCTION_COUNT):
+        function = _node(graph, "function", name=f"fn_{f}")
+        function.x, function.y = 0.0, f * 2000.0
+        previous = function
+        for i in range(0, per_function - 1, 2):
+            echo = _node(graph, "echo")
+            variable = _node(graph, "get_variable", name=f"v{i}")
+            echo.x, echo.y = 300.0 + i * 120.0, f * 2000.0
+            variable.x, variable.y = echo.x, echo.y + 200.0
+            graph.add_edge(previous.outputs[0], echo.inputs[0])
+            graph.add_edge(variable.outputs[0], echo.inputs[1])
+            previous = echo
+    call = _node(graph, "call", function="fn_0")
+    graph.add_edge(start.outputs[0], call.inputs[0])
+    return graph
+
+
+SHAPES = {
+    "chain": linear_chain,
+    "sequencer": wide_sequencer,
+    "nested": nested_blocks,
+    "math_dag": math_dag,
+    "functions": functions_and_calls,
+    "library": function_library,
+}
@@ -0,0 +1,149 @@
+# graph_memory.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Memory used by the graph model: the previous dict based Port/Node/Edge with uuid4 ids
+# against the current slotted model with integer handles. Both sides build the nodes the
+# editor creates (echo and get_variable, through the node registry for the current model).
+# Usage: python -m benchmarks.graph_memory [--nodes N] [--seed N]
+
+import argparse
+import gc
+import random
+import tracemalloc
+from uuid import uuid4
+
+import nodes.command_nodes
+import nodes.variable_nodes
+from core.graph import Edge
+from core.node_color import NodeColor
+from core.port_types import PortType, PortDirection
+from nodes.registry import create_node
+
+
+class LegacyPort:
+    def __init__(self, name, port_type, direction, node, tooltip=""):
+        self.id = str(uuid4())
+        self.name = name
+        self.port_type = port_type
+        self.direction = direction
+        self.node = node
+        self.value = None
+        self.connected_edges = []
+        self.tooltip = tooltip
+
+
+class LegacyNode:
+    def __init__(self, node_type, title):
+        self.id = str(uuid4())
+        self.node_type = node_type
+        self.title = title
+        self.inputs = []
+        self.outputs = []
+        self.x = 0.0
+        self.y = 0.0
+        self.z = 0.0
+        self.properties = {}
+        self.color = "#9d9d9d" # BaseNode
+
+    def add_input(self, name, port_type, tooltip=""):
+        port = LegacyPort(name, port_type, PortDirection.INPUT, self, tooltip)
+        self.inputs.append(port)
+        return port
+
+    def add_output(self, name, port_type, tooltip=""):
+        port = LegacyPort(name, port_type, PortDirection.OUTPUT, self, tooltip)
+        self.outputs.append(port)
+        return port
+
+
+class LegacyEdge:
+    def __init__(self, source, target):
+        self.id = str(uuid4())
+        self.source = source
+        self.target = target
+        source.connected_edges.append(self)
+        target.connected_edges.append(self)
+
+
+def create_legacy_node(node_type):
+    # the ports and properties EchoNode and GetVariableNode set up
+    if node_type == "echo":
+        node = LegacyNode("echo", "Echo")
+        node.add_input("Exec", PortType.EXEC, "Control flow input")
+        node.add_input("Text", PortType.ANY, "Things to print")
+        node.add_output("Exec", PortType.EXEC, "Control flow output")
+        node.properties["text"] = "Hello"
+    else:
+        node = LegacyNode("get_variable", "Get Variable")
+        node.add_output("Value", PortType.VARIABLE, "Variable value")
+        node.properties["variable"] = "VAR"
+    return node
+
+
+def build(make_node, edge_class, node_count, seed):
+    # an exec chain of echo nodes, every fourth node is a variable that later echos may print
+    rng = random.Random(seed)
+    nodes = {}
+    edges = {}
+    echos = []
+    variables = []
+    for i in range(node_count):
+        node = make_node("get_variable" if i % 4 == 3 else "echo")
+        nodes[node.id] = node
+        (variables if node.node_type == "get_variable" else echos).append(node)
+        if node.node_type != "echo":
+            continue
+        if len(echos) > 1:
+            edge = edge_class(echos[-2].outputs[0], node.inputs[0])
+            edges[edge.id] = edge
+        if variables and rng.random() < 0.5:
+            edge = edge_class(rng.choice(variables).outputs[0], node.inputs[1])
+            edges[edge.id] = edge
+    return nodes, edges
+
+
+def measure(make_node, edge_class, node_count, seed):
+    gc.collect()
+    tracemalloc.start()
+    model = build(make_node, edge_class, node_count, seed)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    ports = sum(len(n.inputs) + len(n.outputs) for n in model[0].values())
+    del model
+    return current, peak, ports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory used by the graph model")
+    parser.add_argument("--nodes", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    NodeColor.set_node_colors()
+    results = {}
+    for name, make_node, edge_class in (("legacy", create_legacy_node, LegacyEdge), ("compact", create_node, Edge)):
+        current, peak, ports = measure(make_node, edge_class, args.nodes, args.seed)
+        results[name] = current
+        print(f"{name:<8} nodes={args.nodes} ports={ports} "
+              f"current={current / 2**20:.1f}MiB peak={peak / 2**20:.1f}MiB")
+    print(f"compact / legacy: {results['compact'] / results['legacy']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# node_loading.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Building a graph from a saved document: nodes generating a uuid4 for themselves and
+# each port that the loader then overwrites (how nodes used to be built), against the
+# factory path taking the saved ids up front, with and without the cyclic GC running.
+# Usage: python -m benchmarks.node_loading [--shapes math_dag,...] [--sizes 10000,50000] [--repeat N]
+
+import argparse
+import gc
+from uuid import uuid4
+
+from benchmarks.generators import SHAPES
+from benchmarks.suite import best_of
+from core.graph import Graph
+from core.node_color import NodeColor
+from core.serializer import Serializer
+from nodes.registry import NODE_REGISTRY, NodeFactory
+
+DEFAULT_SIZES = (10000, 50000)
+
+
+def load_eager_ids(data):
+    graph = Graph()
+    port_map = {}
+    for node_data in data["nodes"]:
+        node = NODE_REGISTRY[node_data["type"]]["class"]()
+        node.uuid = str(uuid4())
+        for port in node.inputs + node.outputs:
+            port.uuid = str(uuid4())
+        # then overwritten with the saved ones
+        node.uuid = node_data["id"]
+        node.title = node_data["title"]
+        node.x, node.y, node.z = node_data["x"], node_data["y"], node_data.get("z", 0)
+        node.properties = node_data.get("properties", {})
+        for saved, port in zip(node_data["inputs"], node.inputs):
+            port.uuid = saved["id"]
+            port_map[port.uuid] = port
+        for saved, port in zip(node_data["outputs"], node.outputs):
+            port.uuid = saved["id"]
+            port_map[port.uuid] = port
+        graph.add_node(node)
+    for edge_data in data["edges"]:
+        source = port_map.get(edge_data["source"])
+        target = port_map.get(edge_data["target"])
+        if source and target:
+            graph.add_edge(source, target)
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Node construction while loading a graph")
+    parser.add_argument("--shapes", default="chain,math_dag", help=f"comma separated, from {', '.join(SHAPES)}")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma separated node counts")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measure, the fastest is kept")
+    args = parser.parse_args()
+    NodeColor.set_node_colors() # nodes warn about a missing color when created
+
+    for shape in [s for s in args.shapes.split(",") if s]:
+        for size in [int(s) for s in args.sizes.split(",") if s]:
+            data = Serializer.to_data(SHAPES[shape](size))
+            repeat = max(1, args.repeat)
+            timings = {
+                "eager uuid4 ids": best_of(repeat, lambda: load_eager_ids(data)),
+                "ids up front": best_of(repeat, lambda: Serializer.from_data.__wrapped__(data, NodeFactory)),
+                "ids up front, gc paused": best_of(repeat, lambda: Serializer.from_data(data, NodeFactory)),
+            }
+            gc.collect()
+            base = timings["eager uuid4 ids"]
+            for name, seconds in timings.items():
+                print(f"{shape:<10} {size:>7} nodes  {name:<24} {seconds * 1e3:9.1f} ms  {base / seconds:5.2f}x", flush=True)
+
+
+if __name__ == "__main__":
+    main()
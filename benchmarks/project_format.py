@@ -0,0 +1,70 @@
+# project_format.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Saving and loading the synthetic graphs of benchmarks/generators.py as json and in
+# the binary format, through files like the editor does.
+# Usage: python -m benchmarks.project_format [--shapes chain,...] [--sizes 1000,...] [--repeat N]
+
+import argparse
+import os
+import tempfile
+
+from benchmarks.generators import SHAPES
+from benchmarks.suite import best_of
+from nodes.registry import NodeFactory
+from core.serializer import Serializer
+from core.node_color import NodeColor
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+
+def bench_graph(graph, repeat, directory):
+    json_path = os.path.join(directory, "graph.json")
+    binary_path = os.path.join(directory, "graph.vishb")
+    results = {
+        "save_json": best_of(repeat, lambda: Serializer.write_file(graph, json_path)),
+        "save_binary": best_of(repeat, lambda: Serializer.write_file(graph, binary_path, binary=True)),
+        "load_json": best_of(repeat, lambda: Serializer.load_file(json_path, NodeFactory)),
+        "load_binary": best_of(repeat, lambda: Serializer.load_file(binary_path, NodeFactory)),
+    }
+    return results, os.path.getsize(json_path), os.path.getsize(binary_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="json against binary project files")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help=f"comma separated, from {', '.join(SHAPES)}")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma separated node counts")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measure, the fastest is kept")
+    args = parser.parse_args()
+    NodeColor.set_node_colors() # nodes warn about a missing color when created
+
+    with tempfile.TemporaryDirectory() as directory:
+        for shape in [s for s in args.shapes.split(",") if s]:
+            for size in [int(s) for s in args.sizes.split(",") if s]:
+                graph = SHAPES[shape](size)
+                timings, json_size, binary_size = bench_graph(graph, max(1, args.repeat), directory)
+                print(f"{shape:<10} {size:>7} nodes  json {json_size / 2**20:8.2f} MiB  "
+                      f"binary {binary_size / 2**20:8.2f} MiB ({binary_size / json_size:.2f}x)")
+                for fmt in ("json", "binary"):
+                    print(f"{'':<27} {fmt:<7} save {timings['save_' + fmt] * 1e3:9.1f} ms  "
+                          f"load {timings['load_' + fmt] * 1e3:9.1f} ms", flush=True)
+                del graph
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# suite.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Times emit, deserialize, layout and connection validation on the synthetic graphs of
+# benchmarks/generators.py, writes the results as json and compares them to a baseline.
+# Usage: python -m benchmarks.suite [--shapes chain,...] [--sizes 100,1000,...] [--repeat N]
+#                                   [--output results.json] [--baseline baseline.json]
+#                                   [--update-baseline] [--threshold 0.25]
+# Exits with status 1 when an operation got slower than the baseline by more than the threshold.
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+from benchmarks.generators import SHAPES
+from nodes.registry import NodeFactory
+from core.bash_emitter import BashEmitter
+from core.layout import GraphLayoutEngine
+from core.node_color import NodeColor
+from core.port_types import PortDirection, PortType
+from core.serializer import Serializer
+from core.validator import GraphValidator
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+VALIDATION_SAMPLES = 1000
+NOISE_FLOOR = 0.002 # seconds, differences below this are never reported
+
+
+def best_of(repeat, function):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def validation_pairs(graph, count, seed=0):
+    # what GraphScene hands the validator: port items knowing their side
+    rng = random.Random(seed)
+    outputs = [p for n in graph.nodes.values() for p in n.outputs if p.port_type == PortType.EXEC]
+    inputs = [p for n in graph.nodes.values() for p in n.inputs if p.port_type == PortType.EXEC]
+    pairs = []
+    for _ in range(count if outputs and inputs else 0):
+        source, target = rng.choice(outputs), rng.choice(inputs)
+        pairs.append((
+            SimpleNamespace(port=source, is_input=source.direction == PortDirection.INPUT),
+            SimpleNamespace(port=target, is_input=target.direction == PortDirection.INPUT),
+        ))
+    return pairs
+
+
+def bench_graph(graph, repeat):
+    data = Serializer.serialize(graph)
+    pairs = validation_pairs(graph, VALIDATION_SAMPLES)
+
+    def validate():
+        for a, b in pairs:
+            GraphValidator.is_valid_connection(graph, a, b)
+
+    results = {
+        "emit": best_of(repeat, lambda: BashEmitter(graph).emit()),
+        "deserialize": best_of(repeat, lambda: Serializer.deserialize(data, NodeFactory)),
+        "layout": best_of(repeat, lambda: GraphLayoutEngine(graph).compute()),
+    }
+    if pairs:
+        # per call, the total depends on the sample count
+        results["validate"] = best_of(repeat, validate) / len(pairs)
+    return results
+
+
+def run(shapes, sizes, repeat):
+    results = []
+    for shape in shapes:
+        for size in sizes:
+            graph = SHAPES[shape](size)
+            timings = bench_graph(graph, repeat)
+            for op, seconds in timings.items():
+                results.append({"shape": shape, "size": size, "nodes": len(graph.nodes),
+                                "edges": len(graph.edges), "op": op, "seconds": seconds})
+                unit = "us/call" if op == "validate" else "ms"
+                value = seconds * 1e6 if op == "validate" else seconds * 1e3
+                print(f"{shape:<10} {size:>7} nodes  {op:<12} {value:10.3f} {unit}", flush=True)
+            del graph
+    return results
+
+
+def regressions(results, baseline, threshold):
+    previous = {(r["shape"], r["size"], r["op"]): r["seconds"] for r in baseline.get("results", [])}
+    slower = []
+    for r in results:
+        before = previous.get((r["shape"], r["size"], r["op"]))
+        if before is None:
+            continue
+        after = r["seconds"]
+        floor = NOISE_FLOOR / VALIDATION_SAMPLES if r["op"] == "validate" else NOISE_FLOOR
+        if after > before * (1 + threshold) and after - before > floor:
+            slower.append((r, before))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmarks on synthetic graphs")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help=f"comma separated, from {', '.join(SHAPES)}")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="comma separated node counts")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measure, the fastest is kept")
+    parser.add_argument("--output", help="write the results to this json file")
+    parser.add_argument("--baseline", help="json results to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to --baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before flagging, 0.25 is 25%%")
+    args = parser.parse_args()
+    NodeColor.set_node_colors() # otherwise deserialize mostly measures the missing color warnings
+
+    shapes = [s for s in args.shapes.split(",") if s]
+    unknown = [s for s in shapes if s not in SHAPES]
+    if unknown:
+        parser.error(f"unknown shape(s): {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    document = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "version": Serializer.VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": args.repeat,
+        "results": run(shapes, sizes, max(1, args.repeat)),
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+
+    if not args.baseline:
+        return 0
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(document, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    slower = regressions(document["results"], baseline, args.threshold)
+    for r, before in slower:
+        print(f"REGRESSION {r['shape']} {r['size']} {r['op']}: {before * 1e3:.3f} ms -> "
+              f"{r['seconds'] * 1e3:.3f} ms (+{(r['seconds'] / before - 1) * 100:.0f}%)")
+    if not slower:
+        print(f"no regression above {args.threshold * 100:.0f}% against {args.baseline}")
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
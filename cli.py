@@ -0,0 +1,254 @@
+# cli.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Headless compiler: vish compile <project or graph.json>...
+# Nothing imported here may pull in PySide6, this has to run on machines without a display.
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import nodes.flow_nodes
+import nodes.command_nodes
+import nodes.variable_nodes
+import nodes.operation_nodes
+import nodes.utils_node
+from nodes.registry import NodeFactory
+from core.bash_emitter import BashEmitter
+from core.serializer import Serializer
+from core.binary_format import BinaryFormat
+from core.compression import Compression, HEAD_SIZE
+from core.function_store import FunctionStore
+from core.config import Config
+from core.logger import Logger
+from core.node_color import NodeColor
+
+class Compiler:
+    @staticmethod
+    def resolve_graph(path: Path):
+        # a project directory (project.json + its graph file) or a graph file directly
+        if path.is_dir():
+            graph_file = "graph.json"
+            project_file = path / "project.json"
+            if project_file.exists():
+                graph_file = json.loads(project_file.read_text()).get("graph_file", graph_file)
+            return path / graph_file, path.name
+        return path, path.stem
+
+    @staticmethod
+    def script_path(path: Path, output_dir=None) -> Path:
+        graph_path, name = Compiler.resolve_graph(path)
+        script_dir = Path(output_dir) if output_dir else graph_path.parent
+        return script_dir / f"{name}.sh"
+
+    @staticmethod
+    def compile_project(task):
+        # runs in the worker processes, so it only takes and returns plain data
+        path, output_dir, optimize, shebang = task
+        Config.OPTIMIZE_SCRIPT = optimize
+        Config.CUSTOM_SHEBANG = shebang
+        if not NodeColor.node_colors:
+            NodeColor.set_node_colors() # nodes warn about a missing color when created
+        Logger.logged_messages.clear()
+
+        result = {"project": path, "script": None, "nodes": 0, "seconds": 0.0, "warnings": [], "error": None}
+        start = time.perf_counter()
+        try:
+            graph_path, _ = Compiler.resolve_graph(Path(path))
+            graph, _, _ = Serializer.load_file(graph_path, NodeFactory)
+
+            # emitted next to the script then renamed over it, a failed emit leaves the old script
+            script_path = Compiler.script_path(Path(path), output_dir)
+            tmp_path = script_path.with_name(script_path.name + ".tmp")
+            try:
+                with open(tmp_path, "w") as f:
+                    BashEmitter(graph).emit_to(f)
+                os.chmod(tmp_path, 0o755)
+                os.replace(tmp_path, script_path)
+            except BaseException:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+            result["script"] = str(script_path)
+            result["nodes"] = len(graph.nodes)
+        except ValueError as e:
+            # Serializer reports unknown node types as (message, node_type)
+            result["error"] = e.args[0][0] if e.args and isinstance(e.args[0], tuple) else str(e)
+        except Exception as e:
+            result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - start
+        result["warnings"] = list(Logger.logged_messages)
+        return result
+
+    @staticmethod
+    def compile_all(paths, output_dir=None, jobs=None, optimize=True, shebang=Config.CUSTOM_SHEBANG):
+        # projects that would write the same script (same names with -o, or one project
+        # given twice) all fail instead of overwriting each other
+        owners = {}
+        for path in paths:
+            try:
+                script_path = Compiler.script_path(Path(path), output_dir).resolve()
+            except (OSError, ValueError):
+                continue # reported by compile_project
+            owners.setdefault(script_path, []).append(str(path))
+        clashes = {}
+        for script_path, projects in owners.items():
+            if len(projects) > 1:
+                for i, project in enumerate(projects):
+                    others = ", ".join(projects[:i] + projects[i + 1:])
+                    clashes[project] = f"{script_path} is also the script of {others}"
+
+        tasks = [(str(path), output_dir, optimize, shebang) for path in paths if str(path) not in clashes]
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(tasks) or 1))
+        if jobs == 1:
+            compiled = [Compiler.compile_project(task) for task in tasks]
+        else:
+            # bigger chunks keep the pickling overhead low with hundreds of small projects
+            chunksize = max(1, len(tasks) // (jobs * 4))
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                compiled = list(pool.map(Compiler.compile_project, tasks, chunksize=chunksize))
+
+        compiled = iter(compiled)
+        results = []
+        for path in paths:
+            if str(path) in clashes:
+                results.append({
+                    "project": str(path), "script": None, "nodes": 0, "seconds": 0.0,
+                    "warnings": [], "error": clashes[str(path)]
+                })
+            else:
+                results.append(next(compiled))
+        return results, jobs
+
+    @staticmethod
+    def convert(path: Path, target: str, output: Path = None, compression: str = None) -> Path:
+        # works on the documents themselves, no graph is built so nothing can be lost.
+        # Without a compression, the one of the file is kept
+        graph_path, _ = Compiler.resolve_graph(path)
+        output = output or graph_path
+        if compression is None:
+            with open(graph_path, "rb") as f:
+                compression = Compression.detect(f.read(HEAD_SIZE))
+        data = Compiler._convert_file(graph_path, output, target, compression)
+
+        # function bodies saved in their own files follow the graph file
+        for uuid in data.get("functions", {}):
+            body_output = FunctionStore.body_path(output, uuid)
+            body_output.parent.mkdir(exist_ok=True)
+            Compiler._convert_file(FunctionStore.body_path(graph_path, uuid), body_output, target, compression)
+
+        # the editor saves projects with the compression of their project.json
+        project_file = path / "project.json"
+        if output == graph_path and project_file.exists():
+            project_data = json.loads(project_file.read_text())
+            if project_data.get("compression", compression) != compression:
+                project_data["compression"] = compression
+                project_file.write_text(json.dumps(project_data, indent=4))
+        return output
+
+    @staticmethod
+    def _convert_file(path: Path, output: Path, target: str, compression: str):
+        data = Serializer.read_document(path)
+        if target == "binary":
+            content = BinaryFormat.encode(data)
+        else:
+            content = json.dumps(data, indent=2).encode("utf-8")
+        output.write_bytes(Compression.compress(content, compression))
+        return data
+
+def convert_main(args) -> int:
+    for path in args.projects:
+        try:
+            output = Compiler.convert(path, args.to, args.output if len(args.projects) == 1 else None, args.compression)
+        except (OSError, ValueError) as e:
+            print(f"FAIL {path}: {e}", file=sys.stderr)
+            return 1
+        compression = f", {args.compression}" if args.compression else ""
+        print(f"ok   {path} -> {output} ({args.to}{compression}, {output.stat().st_size} bytes)")
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="vish", description="Visual Bash Editor")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = commands.add_parser("compile", help="Compile projects to bash scripts without opening the editor")
+    compile_parser.add_argument("projects", nargs="+", type=Path, help="Project directories or graph json files")
+    compile_parser.add_argument("-o", "--output", type=Path, help="Directory for the scripts (default: next to each graph)")
+    compile_parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    compile_parser.add_argument("--no-optimize", action="store_true", help="Disable script optimizations")
+    compile_parser.add_argument("--shebang", default=Config.CUSTOM_SHEBANG, help="First line of the scripts")
+    compile_parser.add_argument("--summary", type=Path, help="Write the timing summary as json to this file")
+
+    convert_parser = commands.add_parser("convert", help="Rewrite graph files as json or binary")
+    convert_parser.add_argument("projects", nargs="+", type=Path, help="Project directories or graph files")
+    convert_parser.add_argument("--to", choices=("json", "binary"), required=True, help="Format to write")
+    convert_parser.add_argument("--compression", choices=Compression.NAMES, help="Compress the file (default: keep its compression)")
+    convert_parser.add_argument("-o", "--output", type=Path, help="Output file (one input only, default: in place)")
+
+    args = parser.parse_args(argv)
+    if args.command == "convert":
+        return convert_main(args)
+
+    if args.output:
+        args.output.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    results, jobs = Compiler.compile_all(
+        args.projects,
+        output_dir=str(args.output) if args.output else None,
+        jobs=args.jobs,
+        optimize=not args.no_optimize,
+        shebang=args.shebang
+    )
+    elapsed = time.perf_counter() - start
+
+    failed = [r for r in results if r["error"]]
+    for r in results:
+        if r["error"]:
+            print(f"FAIL {r['project']}: {r['error']}", file=sys.stderr)
+        else:
+            print(f"ok   {r['project']} -> {r['script']} ({r['nodes']} nodes, {r['seconds'] * 1000:.1f} ms)")
+        for warning in r["warnings"]:
+            print(f"     {warning}", file=sys.stderr)
+
+    compile_time = sum(r["seconds"] for r in results)
+    print(
+        f"Compiled {len(results) - len(failed)}/{len(results)} projects in {elapsed:.2f} s "
+        f"with {jobs} worker(s), {compile_time:.2f} s of compile time"
+    )
+
+    if args.summary:
+        args.summary.write_text(json.dumps({
+            "jobs": jobs,
+            "wall_seconds": elapsed,
+            "compile_seconds": compile_time,
+            "failed": len(failed),
+            "projects": results,
+        }, indent=2))
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -42,7 +42,7 @@ class AddNodeCommand(QUndoCommand):
 
 
 class RemoveNodeCommand(QUndoCommand):
-    def __init__(self, view, node_id: str):
+    def __init__(self, view, node_id: int):
         super().__init__("Remove Node")
         self.view = view
         self.scene = view.scene()
@@ -106,7 +106,7 @@ class AddEdgeCommand(QUndoCommand):
 
 
 class MoveNodeCommand(QUndoCommand):
-    def __init__(self, view, node_id: str, old_pos, new_pos):
+    def __init__(self, view, node_id: int, old_pos, new_pos):
         super().__init__("Move Node")
         self.view = view
         self.graph = view.graph
@@ -17,18 +17,71 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from typing import List, Dict
+from typing import List, Dict, Optional, Set, TextIO
+from core.port_types import PortType
+from core.emit_cache import (FragmentCache, OP_LINE, OP_FUNCTION_LINE, OP_INDENT,
+                             OP_DEDENT, OP_VARIABLE, OP_CHAIN, OP_BUFFER, OP_TEMP, OP_DISCARD)
+
+_MISSING = object()
+
+class ScriptWriter:
+    # Stands in for the line lists of BashContext when emitting to a stream: lines are
+    # joined with "\n" exactly like get_script does and written out every buffer_size chars
+    def __init__(self, stream: TextIO, buffer_size: int = 1 << 16):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._chunk: List[str] = []
+        self._size = 0
+        self._first = True
+
+    def append(self, line: str):
+        if self._first:
+            self._first = False
+        else:
+            self._chunk.append("\n")
+            self._size += 1
+        self._chunk.append(line)
+        self._size += len(line)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._chunk:
+            self.stream.write("".join(self._chunk))
+            self._chunk.clear()
+            self._size = 0
 
 class BashContext:
-    def __init__(self):
+    def __init__(self, fragment_cache: Optional[FragmentCache] = None, writer: Optional[ScriptWriter] = None,
+                 optimize: bool = False):
         self.variables: Dict[str, str] = {}
         self.indent_level = 0
         self.lines: List[str] = []
-        self.function_lines = []
+        self.function_lines = writer if writer is not None else []
+        self.writer = writer
         self.emitted_nodes = set()
         self._current_buffer = "main"
-    
+        self.fragment_cache = fragment_cache
+        self._recording = [] # one entry per node being emitted, None while a cached fragment is replayed
+        self._values = {} # output port id -> expression, data nodes are pure so one evaluation per pass is enough
+        self._conditions = {}
+        self._discarding = 0
+        self.arithmetic = {} # output port id -> expression inside $(( )), or its value when it was folded
+        self.optimize = optimize
+        self._shared: Set[int] = set() # nodes of the current statement to hoist into temp variables
+        self._temp_count = 0
+
+    def _record(self, op):
+        if self._recording and self._recording[-1] is not None:
+            self._recording[-1].append(op)
+
     def add_line(self, line: str):
+        self._record((OP_LINE, line))
+        self._write_line(line)
+
+    def _write_line(self, line: str):
+        if self._discarding:
+            return
         indent = "    " * self.indent_level
         if self._current_buffer == "function":
             self.function_lines.append(f"{indent}{line}")
@@ -36,13 +89,125 @@ class BashContext:
             self.lines.append(f"{indent}{line}")
 
     def add_function_line(self, line: str):
+        self._record((OP_FUNCTION_LINE, line))
         self.function_lines.append(line)
 
+    def set_variable(self, name: str, value_expr: str):
+        self._record((OP_VARIABLE, name, value_expr))
+        self.variables[name] = value_expr
+
+    def set_buffer(self, buffer: str, indent_level: int):
+        self._record((OP_BUFFER, buffer, indent_level))
+        self._current_buffer = buffer
+        self.indent_level = indent_level
+
+    def resolve_value(self, port):
+        value = self._values.get(port.id, _MISSING)
+        if value is _MISSING:
+            value = port.node.emit_bash_value(self)
+            if value is not None and port.node.id in self._shared and not isinstance(self.arithmetic.get(port.id), int):
+                value = self._hoist(value)
+            self._values[port.id] = value
+        return value
+
+    def _hoist(self, expr: str) -> str:
+        self._temp_count += 1
+        name = f"_vish_{self._temp_count}"
+        self.add_temp(name, expr)
+        return f"${name}"
+
+    def add_temp(self, name: str, expr: str):
+        # recorded on its own since "local" depends on where the fragment is replayed
+        self._record((OP_TEMP, name, expr))
+        if self._current_buffer == "function":
+            self._write_line(f"local {name}={expr}")
+        else:
+            self._write_line(f"{name}={expr}")
+
+    def begin_statement(self, node=None):
+        # With optimize on, expressions are only shared inside one statement: the
+        # temp variables are assigned right before it, and a variable set in between
+        # two statements must not be read from an old temp. node=None ends the statement.
+        if not self.optimize:
+            return
+        self._values.clear()
+        self._conditions.clear()
+        self.arithmetic.clear()
+        self._temp_count = 0
+        if node is None or not node.hoist_inputs:
+            self._shared = set()
+        else:
+            self._shared = BashContext.shared_nodes(node)
+
+    @staticmethod
+    def shared_nodes(node) -> Set[int]:
+        # hoistable nodes used more than once by the data inputs upstream of node
+        uses: Dict[int, int] = {}
+        hoistable = set()
+        visited = {node.id}
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for port in current.inputs:
+                if port.port_type == PortType.EXEC or not port.connected_edges:
+                    continue
+                source = port.connected_edges[0].source.node
+                uses[source.id] = uses.get(source.id, 0) + 1
+                if source.id not in visited:
+                    visited.add(source.id)
+                    stack.append(source)
+                    if source.hoistable:
+                        hoistable.add(source.id)
+        return {node_id for node_id in hoistable if uses[node_id] > 1}
+
+    def resolve_condition(self, port):
+        condition = self._conditions.get(port.id, _MISSING)
+        if condition is _MISSING:
+            condition = port.node.emit_condition(self)
+            self._conditions[port.id] = condition
+        return condition
+
+    def discard(self, enabled: bool):
+        # while enabled, nodes are emitted as usual but their lines are dropped
+        self._record((OP_DISCARD, enabled))
+        self._discarding += 1 if enabled else -1
+
     def indent(self):
+        self._record((OP_INDENT,))
         self.indent_level += 1
     
     def dedent(self):
+        self._record((OP_DEDENT,))
         self.indent_level = max(0, self.indent_level - 1)
+
+    def record_chain(self, start_node, stop_at=None):
+        self._record((OP_CHAIN, start_node, stop_at))
+
+    def begin_node(self, node):
+        # Returns the cached fragment of node if there is a valid one, otherwise
+        # starts recording what the node emits
+        if self.fragment_cache is None:
+            return None
+        fragment = self.fragment_cache.get(node.id)
+        self._recording.append(None if fragment else [])
+        return fragment
+
+    def end_node(self, node):
+        if self.fragment_cache is None:
+            return
+        ops = self._recording.pop()
+        if ops is not None:
+            self.fragment_cache.store(node, ops)
     
+    def begin_main(self):
+        # Called once every function is emitted. When streaming, the function section is
+        # complete so the main section can go to the writer too
+        if self.writer is None:
+            return
+        self.writer.append("")
+        for line in self.lines:
+            self.writer.append(line)
+        self.lines = self.writer
+
     def get_script(self) -> str:
         return "\n".join(self.function_lines + [""] + self.lines)
@@ -17,18 +17,50 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+from typing import List, TextIO
 from core.graph import Graph
 from nodes.base_node import BaseNode
-from core.bash_context import BashContext
+from core.bash_context import BashContext, ScriptWriter
+from core.emit_cache import FragmentCache
+from core.emit_profile import EmitProfile, ProfilingContext
 from core.config import Config
+import time
 
 class BashEmitter:
-    def __init__(self, graph: Graph):
+    def __init__(self, graph: Graph, incremental: bool = False):
         self.graph = graph
+        self.fragment_cache = None
+        if incremental: # keep node fragments between emits, the graph tells us what to throw away
+            self.fragment_cache = FragmentCache()
+            graph.change_listeners.append(self.fragment_cache.invalidate)
+        self._optimize = Config.OPTIMIZE_SCRIPT
+        self.last_profile = None # EmitProfile of the last generation when Config.PROFILE_EMIT is on
+
+    def _new_context(self, writer=None) -> BashContext:
+        if self._optimize != Config.OPTIMIZE_SCRIPT:
+            self._optimize = Config.OPTIMIZE_SCRIPT
+            if self.fragment_cache:
+                self.fragment_cache.clear()
+        if Config.PROFILE_EMIT:
+            self.last_profile = EmitProfile()
+            return ProfilingContext(self.last_profile, self.fragment_cache, writer, optimize=self._optimize)
+        return BashContext(self.fragment_cache, writer, optimize=self._optimize)
 
     def emit(self) -> str:
-        context = BashContext()
+        context = self._new_context()
+        self._emit_nodes(context)
+        return "\n".join(self._header()) + context.get_script()
+
+    def emit_to(self, stream: TextIO, buffer_size: int = 1 << 16):
+        # Same output as emit() but written to stream as it is generated, only
+        # about buffer_size chars of the script are held at once
+        writer = ScriptWriter(stream, buffer_size)
+        context = self._new_context(writer)
+        stream.write("\n".join(self._header()))
+        self._emit_nodes(context)
+        writer.flush()
 
+    def _header(self) -> List[str]:
         header = [
             "#!/usr/bin/env bash",
             "",
@@ -38,14 +70,25 @@ class BashEmitter:
         ]
         if Config.CUSTOM_SHEBANG:
             header[0] = Config.CUSTOM_SHEBANG
-        for node in self.graph.nodes.values():
-            if node.node_type == "function":
-                if node.id in context.emitted_nodes:
-                    continue
-                context.emitted_nodes.add(node.id)
-                node.emit_bash(context)
+        return header
+
+    def _emit_nodes(self, context: BashContext):
+        if isinstance(context, ProfilingContext):
+            start = time.perf_counter()
+            self._emit_chains(context)
+            context.profile.total = time.perf_counter() - start
+            context.profile.log()
+        else:
+            self._emit_chains(context)
+
+    def _emit_chains(self, context: BashContext):
+        self.graph.ensure_loaded()
+        for node in self.graph.get_nodes_of_type("function"):
+            if node.id in context.emitted_nodes:
+                continue
+            BaseNode.emit_exec_chain(node, context, stop_at=node)
+        context.begin_main()
         start_node = self.graph.get_start_node()
         if start_node and start_node.outputs and start_node.outputs[0].connected_edges:
             first = start_node.outputs[0].connected_edges[0].target.node
             BaseNode.emit_exec_chain(first, context)
-        return "\n".join(header) + context.get_script()
@@ -0,0 +1,254 @@
+# binary_format.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List
+
+# Binary graph file, holding exactly the document Serializer writes as json:
+#
+#   magic (8 bytes) | format version (u16) | 4 section lengths (u32)
+#   strings: u32 byte length of every string, then the utf-8 bytes back to back
+#   words:   u32 stream, every string is an index in the string table
+#            per node:  id type title n_props n_inputs n_outputs coord_flags
+#                       (key value) * n_props, (id name type) * (n_inputs + n_outputs)
+#            per edge:  id source_node source_port target_node target_port
+#                       (id is _NULL_ID for "id": null, _NO_ID when there was no id)
+#   coords:  f64 x y z per node, coord_flags tells which were json integers
+#            (so files convert back to the same json) and when z was missing
+#   meta:    json of the other top level keys (version, comments, viewport...)
+#
+# Edges point to ports by node index + port index (inputs first, then outputs)
+# instead of repeating their uuid.
+# Everything is little endian. Version 1 files have no coord_flags, their
+# coordinates are all floats, and store missing or null edge ids as "".
+MAGIC = b"VISHBIN\x00"
+FORMAT_VERSION = 2
+_HEADER = struct.Struct("<8sHIIII")
+_NOT_A_STRING = 0x80000000 # property values that are not strings are stored as json
+_DANGLING = 0xFFFFFFFF # edge end that is not a port of the file, followed by its uuid
+_INT_X, _INT_Y, _INT_Z, _NO_Z = 1, 2, 4, 8 # coord_flags
+_NULL_ID, _NO_ID = 0xFFFFFFFE, 0xFFFFFFFF # edge id that is not a string
+_MISSING = object()
+
+class BinaryFormat:
+    @staticmethod
+    def is_binary(head: bytes) -> bool:
+        return head[:len(MAGIC)] == MAGIC
+
+    @staticmethod
+    def encode(data: Dict[str, Any]) -> bytes:
+        strings: List[str] = []
+        index: Dict[str, int] = {}
+
+        def ref(value: str) -> int:
+            i = index.get(value)
+            if i is None:
+                i = index[value] = len(strings)
+                strings.append(value)
+            return i
+
+        words = array("I")
+        coords = array("d")
+        nodes = data.get("nodes", [])
+        edges = data.get("edges", [])
+        port_index = {}
+
+        words.append(len(nodes))
+        for n, node in enumerate(nodes):
+            properties = node.get("properties", {})
+            inputs = node.get("inputs", [])
+            outputs = node.get("outputs", [])
+            x, y, z = node["x"], node["y"], node.get("z")
+            flags = (type(x) is int) * _INT_X | (type(y) is int) * _INT_Y
+            if z is None:
+                z, flags = 0, flags | _NO_Z
+            elif type(z) is int:
+                flags |= _INT_Z
+            words.extend((ref(node["id"]), ref(node["type"]), ref(node["title"]),
+                          len(properties), len(inputs), len(outputs), flags))
+            coords.extend((x, y, z))
+            for key, value in properties.items():
+                if isinstance(value, str):
+                    words.extend((ref(key), ref(value)))
+                else:
+                    words.extend((ref(key), ref(json.dumps(value)) | _NOT_A_STRING))
+            for p, port in enumerate(inputs):
+                port_index[port["id"]] = (n, p)
+                words.extend((ref(port["id"]), ref(port["name"]), ref(port["type"])))
+            for p, port in enumerate(outputs, len(inputs)):
+                port_index[port["id"]] = (n, p)
+                words.extend((ref(port["id"]), ref(port["name"]), ref(port["type"])))
+
+        words.append(len(edges))
+        for edge in edges:
+            edge_id = edge.get("id", _MISSING)
+            words.append(_NO_ID if edge_id is _MISSING else _NULL_ID if edge_id is None else ref(edge_id))
+            for end in (edge["source"], edge["target"]):
+                words.extend(port_index.get(end) or (_DANGLING, ref(end)))
+
+        meta = {key: (None if key in ("nodes", "edges") else value) for key, value in data.items()}
+
+        encoded = [s.encode("utf-8") for s in strings]
+        lengths = array("I", map(len, encoded))
+        if sys.byteorder == "big":
+            for values in (lengths, words, coords):
+                values.byteswap()
+        string_section = lengths.tobytes() + b"".join(encoded)
+        meta_section = json.dumps(meta).encode("utf-8")
+
+        return b"".join((
+            _HEADER.pack(MAGIC, FORMAT_VERSION, len(strings), len(string_section),
+                         len(words), len(meta_section)),
+            string_section, words.tobytes(), coords.tobytes(), meta_section,
+        ))
+
+    @staticmethod
+    def decode(raw: bytes) -> Dict[str, Any]:
+        reader = BinaryReader(raw)
+        nodes = []
+        ports = [] # node index -> inputs + outputs, for the edges
+        for node_id, node_type, title, x, y, z, properties, inputs, outputs in reader.nodes():
+            node_inputs = [{"id": port_id, "name": name, "type": port_type} for port_id, name, port_type in inputs]
+            node_outputs = [{"id": port_id, "name": name, "type": port_type} for port_id, name, port_type in outputs]
+            ports.append(node_inputs + node_outputs)
+            node = {
+                "id": node_id,
+                "type": node_type,
+                "title": title,
+                "x": x,
+                "y": y,
+                "z": z,
+                "properties": properties,
+                "inputs": node_inputs,
+                "outputs": node_outputs,
+            }
+            if z is None:
+                del node["z"]
+            nodes.append(node)
+
+        edges = []
+        for edge_id, source, target in reader.edges(missing=_MISSING):
+            edge = {
+                "id": edge_id,
+                "source": source if isinstance(source, str) else ports[source[0]][source[1]]["id"],
+                "target": target if isinstance(target, str) else ports[target[0]][target[1]]["id"],
+            }
+            if edge_id is _MISSING:
+                del edge["id"]
+            edges.append(edge)
+
+        # keys in the order of the document, "nodes" and "edges" only when it had them
+        data = {}
+        for key, value in reader.meta.items():
+            data[key] = nodes if key == "nodes" else edges if key == "edges" else value
+        return data
+
+class BinaryReader:
+    # walks a binary file without building the json document, Serializer uses it to
+    # create the graph straight from the records
+    def __init__(self, raw: bytes):
+        if not BinaryFormat.is_binary(raw):
+            raise ValueError("Not a Vish binary graph file")
+        _, version, string_count, string_size, word_count, meta_size = _HEADER.unpack_from(raw)
+        if version > FORMAT_VERSION:
+            raise ValueError(f"Binary graph format {version} is newer than this version of Vish")
+        self.version = version
+
+        offset = _HEADER.size
+        lengths = array("I")
+        lengths.frombytes(raw[offset:offset + string_count * 4])
+        words_start = offset + string_size
+        self.words = array("I")
+        self.words.frombytes(raw[words_start:words_start + word_count * 4])
+        coords_start = words_start + word_count * 4
+        self.node_count = struct.unpack_from("<I", raw, words_start)[0] if word_count else 0
+        self.coords = array("d")
+        self.coords.frombytes(raw[coords_start:coords_start + self.node_count * 24])
+        meta_start = coords_start + self.node_count * 24
+        self.meta = json.loads(raw[meta_start:meta_start + meta_size].decode("utf-8"))
+        if sys.byteorder == "big":
+            for values in (lengths, self.words, self.coords):
+                values.byteswap()
+
+        self.strings = strings = []
+        position = offset + string_count * 4
+        for length in lengths:
+            strings.append(raw[position:position + length].decode("utf-8"))
+            position += length
+        self._edges_start = None
+
+    def nodes(self):
+        # (id, type, title, x, y, z, properties, inputs, outputs), ports as (id, name, type),
+        # z is None when the node had none
+        strings, words, coords = self.strings, self.words, self.coords
+        header = 6 if self.version < 2 else 7
+        flags = 0
+        w = 1
+        for n in range(self.node_count):
+            node_id, node_type, title, prop_count, input_count, output_count = words[w:w + 6]
+            if header == 7:
+                flags = words[w + 6]
+            w += header
+            properties = {}
+            for _ in range(prop_count):
+                key, value = words[w], words[w + 1]
+                w += 2
+                if value & _NOT_A_STRING:
+                    properties[strings[key]] = json.loads(strings[value & ~_NOT_A_STRING])
+                else:
+                    properties[strings[key]] = strings[value]
+            inputs = []
+            for _ in range(input_count):
+                inputs.append((strings[words[w]], strings[words[w + 1]], strings[words[w + 2]]))
+                w += 3
+            outputs = []
+            for _ in range(output_count):
+                outputs.append((strings[words[w]], strings[words[w + 1]], strings[words[w + 2]]))
+                w += 3
+            x, y, z = coords[n * 3], coords[n * 3 + 1], coords[n * 3 + 2]
+            if flags:
+                x = int(x) if flags & _INT_X else x
+                y = int(y) if flags & _INT_Y else y
+                z = None if flags & _NO_Z else int(z) if flags & _INT_Z else z
+            yield strings[node_id], strings[node_type], strings[title], x, y, z, properties, inputs, outputs
+        self._edges_start = w
+
+    def edges(self, missing=None):
+        # (id, source, target), an end is (node index, port index) or the uuid of a port outside the file,
+        # id is missing for an edge saved without one
+        if self._edges_start is None:
+            for _ in self.nodes():
+                pass
+        strings, words = self.strings, self.words
+        w = self._edges_start
+        edge_count = words[w]
+        w += 1
+        for _ in range(edge_count):
+            edge_id, source_node, source_port, target_node, target_port = words[w:w + 5]
+            w += 5
+            source = strings[source_port] if source_node == _DANGLING else (source_node, source_port)
+            target = strings[target_port] if target_node == _DANGLING else (target_node, target_port)
+            if self.version < 2:
+                edge_id = strings[edge_id] or None
+            else:
+                edge_id = missing if edge_id == _NO_ID else None if edge_id == _NULL_ID else strings[edge_id]
+            yield edge_id, source, target
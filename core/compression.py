@@ -0,0 +1,96 @@
+# compression.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import bz2
+import gzip
+import io
+import lzma
+
+# Graph files (json or binary) can be stored compressed with one of the stdlib
+# codecs. Which one is used is read from the first bytes of the file, neither json
+# nor the binary format can start like a compressed stream.
+NONE = "none"
+_CODECS = {
+    # name: (magic, compress, open a readable stream over a binary file)
+    "gzip": (
+        b"\x1f\x8b",
+        lambda content: gzip.compress(content, compresslevel=6, mtime=0),
+        lambda f: gzip.GzipFile(fileobj=f, mode="rb"),
+    ),
+    "bz2": (b"BZh", lambda content: bz2.compress(content, 9), lambda f: bz2.BZ2File(f, "rb")),
+    "xz": (b"\xfd7zXZ\x00", lambda content: lzma.compress(content), lambda f: lzma.LZMAFile(f, "rb")),
+}
+HEAD_SIZE = max(len(magic) for magic, _, _ in _CODECS.values())
+
+class Compression:
+    NAMES = (NONE,) + tuple(_CODECS)
+    ERRORS = (EOFError, OSError, lzma.LZMAError) # raised by truncated or damaged streams
+
+    @staticmethod
+    def detect(head: bytes) -> str:
+        for name, (magic, _, _) in _CODECS.items():
+            if head.startswith(magic):
+                return name
+        return NONE
+
+    @staticmethod
+    def check(name) -> str:
+        name = name or NONE
+        if name not in Compression.NAMES:
+            raise ValueError(f"Unknown compression '{name}', expected one of {', '.join(Compression.NAMES)}")
+        return name
+
+    @staticmethod
+    def compress(content: bytes, name) -> bytes:
+        name = Compression.check(name)
+        return content if name == NONE else _CODECS[name][1](content)
+
+    @staticmethod
+    def decompress(raw: bytes) -> bytes:
+        name = Compression.detect(raw[:HEAD_SIZE])
+        if name == NONE:
+            return raw
+        stream = _CODECS[name][2](io.BytesIO(raw))
+        try:
+            return stream.read()
+        except Compression.ERRORS as e:
+            raise ValueError(f"Corrupted {name} graph file: {e}")
+        finally:
+            stream.close()
+
+    @staticmethod
+    def open(f, name):
+        # f: file opened in binary mode, at its start. Returns f itself when uncompressed
+        name = Compression.check(name)
+        return f if name == NONE else _CODECS[name][2](f)
+
+    @staticmethod
+    def read_head(path, size: int):
+        # (compression, first `size` bytes of the content), to sniff the format inside
+        with open(path, "rb") as f:
+            name = Compression.detect(f.read(HEAD_SIZE))
+            f.seek(0)
+            stream = Compression.open(f, name)
+            try:
+                return name, stream.read(size)
+            except Compression.ERRORS as e:
+                raise ValueError(f"Corrupted {name} graph file: {e}")
+            finally:
+                if stream is not f:
+                    stream.close()
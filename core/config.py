@@ -29,6 +29,8 @@ class Config:
     lang = "en"
     theme = "dark"
     CUSTOM_SHEBANG = "#!/usr/bin/env bash"
+    OPTIMIZE_SCRIPT = True
+    PROFILE_EMIT = False
     
 class ConfigManager:
     @staticmethod
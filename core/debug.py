@@ -19,9 +19,6 @@
 
 from core.logger import Logger
 from pathlib import Path
-from PySide6.QtCore import QStandardPaths
-from PySide6.QtGui import QGuiApplication
-from ui.info import MessageWidget
 import getpass
 import os
 import platform
@@ -44,6 +41,7 @@ class Debug:
                 Debug.init_error = True
             return
 
+        from ui.info import MessageWidget # Qt is only imported once a window exists
         toast = MessageWidget(Debug._parent, message, level)
         toast.show_animated()
 
@@ -63,7 +61,8 @@ class Debug:
         Logger.LogMessage(message)
 
 class Info:
-    CONFIG_PATH = os.path.join(QStandardPaths.writableLocation(QStandardPaths.AppConfigLocation), "vish", "config.json")
+    CONFIG_PATH = None # resolved on first use so the headless compiler never imports Qt
+    _device_type = None
     @staticmethod
     def get_os():
         return platform.system()
@@ -75,10 +74,19 @@ class Info:
     
     @staticmethod
     def ensure_config_dir_exists():
-        config_dir = os.path.dirname(Info.CONFIG_PATH)
+        config_dir = os.path.dirname(Info._resolve_config_path())
         if not os.path.exists(config_dir):
             os.makedirs(config_dir)
 
+    @staticmethod
+    def _resolve_config_path():
+        if Info.CONFIG_PATH is None:
+            # GenericConfigLocation is what AppConfigLocation gave when this was resolved at
+            # import time, before QApplication set the application name
+            from PySide6.QtCore import QStandardPaths
+            Info.CONFIG_PATH = os.path.join(QStandardPaths.writableLocation(QStandardPaths.GenericConfigLocation), "vish", "config.json")
+        return Info.CONFIG_PATH
+
     @staticmethod
     def resource_path(relative_path):
         if hasattr(sys, "_MEIPASS"):
@@ -93,6 +101,14 @@ class Info:
 
     @staticmethod
     def get_device_type():
+        # the screen is measured once, windows ask again on every resize
+        if Info._device_type is None:
+            Info._device_type = Info._detect_device_type()
+        return Info._device_type
+
+    @staticmethod
+    def _detect_device_type():
+        from PySide6.QtGui import QGuiApplication
         screen = QGuiApplication.primaryScreen()
         dpi = screen.physicalDotsPerInch()
 
@@ -0,0 +1,94 @@
+# emit_cache.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Dict, Iterable, List, Set, Tuple
+from core.port_types import PortType
+
+# A fragment is what one exec node did to the BashContext while it was emitted,
+# recorded as a list of operations. Nested exec chains (if branches, loop bodies,
+# sequencer steps...) are only recorded as a reference, so each node owns its own
+# lines and a change deep inside a branch never invalidates the parent.
+OP_LINE = 0
+OP_FUNCTION_LINE = 1
+OP_INDENT = 2
+OP_DEDENT = 3
+OP_VARIABLE = 4
+OP_CHAIN = 5
+OP_BUFFER = 6
+OP_TEMP = 7
+OP_DISCARD = 8
+
+class Fragment:
+    __slots__ = ("ops", "deps")
+
+    def __init__(self, ops: List[Tuple], deps: Set[int]):
+        self.ops = ops
+        self.deps = deps
+
+class FragmentCache:
+    def __init__(self):
+        self.fragments: Dict[int, Fragment] = {}
+        self._dependents: Dict[int, Set[int]] = {}
+
+    def get(self, node_id):
+        return self.fragments.get(node_id)
+
+    def store(self, node, ops: List[Tuple]):
+        deps = FragmentCache.data_dependencies(node)
+        self.fragments[node.id] = Fragment(ops, deps)
+        for dep in deps:
+            self._dependents.setdefault(dep, set()).add(node.id)
+
+    def invalidate(self, node_ids: Iterable[int]):
+        for node_id in node_ids:
+            owners = self._dependents.pop(node_id, None)
+            if not owners:
+                continue
+            for owner in owners:
+                fragment = self.fragments.pop(owner, None)
+                if not fragment:
+                    continue
+                for dep in fragment.deps:
+                    if dep == node_id:
+                        continue
+                    dependents = self._dependents.get(dep)
+                    if dependents:
+                        dependents.discard(owner)
+
+    def clear(self):
+        self.fragments.clear()
+        self._dependents.clear()
+
+    @staticmethod
+    def data_dependencies(node) -> Set[int]:
+        # the node itself plus everything feeding its non exec inputs, this is
+        # all an emit_bash implementation is allowed to read
+        deps = {node.id}
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for port in current.inputs:
+                if port.port_type == PortType.EXEC:
+                    continue
+                for edge in port.connected_edges:
+                    source = edge.source.node
+                    if source.id not in deps:
+                        deps.add(source.id)
+                        stack.append(source)
+        return deps
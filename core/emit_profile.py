@@ -0,0 +1,121 @@
+# emit_profile.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import time
+from collections import Counter
+from typing import Dict, List
+from core.bash_context import BashContext
+from core.logger import Logger
+
+class EmitProfile:
+    # Calls, cumulative and self time of every node emitted during one generation.
+    # Exec nodes are timed from begin_node to end_node, so their nested chains count as
+    # children, data nodes for each evaluation of emit_bash_value / emit_condition.
+    def __init__(self):
+        self.by_type: Dict[str, List] = {} # node_type -> [calls, cumulative, self]
+        self.by_node: Dict[int, List] = {} # node id -> [node_type, title, calls, cumulative, self]
+        self.total = 0.0
+        self._stack: List[List] = [] # [node, start, time spent in children]
+        self._open_types = Counter() # node_type -> frames of that type on the stack
+
+    def enter(self, node):
+        self._open_types[node.node_type] += 1
+        self._stack.append([node, time.perf_counter(), 0.0])
+
+    def leave(self):
+        node, start, children = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        own = elapsed - children
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+        # a node type inside itself (nested Ifs...) only counts the outermost cumulative time
+        self._open_types[node.node_type] -= 1
+        nested = self._open_types[node.node_type] > 0
+        stats = self.by_type.get(node.node_type)
+        if stats is None:
+            stats = self.by_type[node.node_type] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += 0.0 if nested else elapsed
+        stats[2] += own
+
+        stats = self.by_node.get(node.id)
+        if stats is None:
+            stats = self.by_node[node.id] = [node.node_type, node.title, 0, 0.0, 0.0]
+        stats[2] += 1
+        stats[3] += elapsed
+        stats[4] += own
+
+    def type_rows(self):
+        # (node_type, calls, cumulative, self), slowest first
+        rows = [(node_type, *stats) for node_type, stats in self.by_type.items()]
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows
+
+    def node_rows(self, limit: int = 50):
+        # (node id, node_type, title, calls, cumulative, self), slowest first
+        rows = [(node_id, *stats) for node_id, stats in self.by_node.items()]
+        rows.sort(key=lambda row: row[5], reverse=True)
+        return rows[:limit]
+
+    def report_lines(self, limit: int = 10) -> List[str]:
+        lines = [f"Emit profile: {len(self.by_node)} nodes in {self.total * 1e3:.1f} ms"]
+        lines.append(f"  {'type':<20} {'calls':>8} {'cumul. ms':>10} {'self ms':>10}")
+        for node_type, calls, cumulative, own in self.type_rows():
+            lines.append(f"  {node_type:<20} {calls:>8} {cumulative * 1e3:>10.2f} {own * 1e3:>10.2f}")
+        lines.append("  slowest nodes:")
+        for node_id, node_type, title, calls, cumulative, own in self.node_rows(limit):
+            lines.append(f"  #{node_id:<6} {title[:20]:<20} {calls:>4} calls {cumulative * 1e3:>9.2f} ms cumul. {own * 1e3:>9.2f} ms self")
+        return lines
+
+    def log(self):
+        for line in self.report_lines():
+            Logger.LogMessage(line)
+
+class ProfilingContext(BashContext):
+    # Only used while Config.PROFILE_EMIT is on, the plain BashContext has no hooks at all
+    def __init__(self, profile: EmitProfile, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profile = profile
+
+    def begin_node(self, node):
+        self.profile.enter(node)
+        return super().begin_node(node)
+
+    def end_node(self, node):
+        super().end_node(node)
+        self.profile.leave()
+
+    def resolve_value(self, port):
+        if port.id in self._values: # memo hit, nothing is emitted
+            return super().resolve_value(port)
+        self.profile.enter(port.node)
+        try:
+            return super().resolve_value(port)
+        finally:
+            self.profile.leave()
+
+    def resolve_condition(self, port):
+        if port.id in self._conditions:
+            return super().resolve_condition(port)
+        self.profile.enter(port.node)
+        try:
+            return super().resolve_condition(port)
+        finally:
+            self.profile.leave()
@@ -0,0 +1,276 @@
+# function_store.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import hashlib
+import json
+import os
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from core.config import Config
+from core.graph import Graph, Node
+from core.logger import Logger
+from core.serializer import Serializer
+
+class FunctionStore:
+    # Projects with "split_functions" keep the body of every function in its own file,
+    # <graph>.functions/<function uuid>.json (same format and compression as the graph).
+    # A body is what is connected to the function node and to nothing else: a function
+    # sharing nodes with the main script or with another function stays in the graph file.
+    #
+    # The graph file lists the bodies under "functions" with what is needed without
+    # reading them: where they are on the canvas, how many nodes they have and a hash
+    # of their content for the script cache. A body is only read when the editor shows
+    # it, when everything is needed (emitting, select all...) or when its function is
+    # deleted, the nodes that were connected to it stay in the project.
+    DIR_SUFFIX = ".functions"
+
+    def __init__(self, graph: Graph, graph_path, entries: Dict[str, Dict[str, Any]], node_factory=None):
+        self.graph = graph
+        self.graph_path = Path(graph_path)
+        self.node_factory = node_factory
+        self.entries = dict(entries) # function uuid -> entry, every body saved apart
+        self.pending: Dict[str, Optional[int]] = {} # function uuid -> function node id, bodies not read yet
+        self.failed = set() # bodies that could not be read, kept as they are on disk
+        self.loading = False # a body is being added to the graph
+        self.loaded_listeners: List[Callable[[Optional[Node], List[Node], list], None]] = []
+
+        functions = {node.uuid: node for node in graph.get_nodes_of_type("function")}
+        for uuid in self.entries:
+            node = functions.get(uuid)
+            self.pending[uuid] = node.id if node else None
+        self._pending_ids = {node_id: uuid for uuid, node_id in self.pending.items() if node_id is not None}
+        graph.function_store = self
+        graph.change_listeners.append(self._graph_changed)
+
+        for uuid, node_id in list(self.pending.items()):
+            if node_id is None: # the function is not in the graph file, its nodes still are in the project
+                self.load(uuid)
+
+    def _graph_changed(self, node_ids):
+        for node_id in node_ids:
+            uuid = self._pending_ids.get(node_id)
+            if uuid is not None and node_id not in self.graph.nodes:
+                self.load(uuid)
+
+    def load(self, uuid: str) -> bool:
+        if uuid not in self.pending or uuid in self.failed:
+            return False
+        path = FunctionStore.body_path(self.graph_path, uuid)
+        try:
+            data = Serializer.read_document(path)
+        except (OSError, ValueError) as e:
+            self.failed.add(uuid)
+            Logger.LogError(f"Could not load the function body {path}: {e}")
+            return False
+
+        node_id = self.pending.pop(uuid)
+        self._pending_ids.pop(node_id, None)
+        function = self.graph.nodes.get(node_id) if node_id is not None else None
+        port_map = {}
+        if function is not None:
+            for port in function.inputs + function.outputs:
+                port_map[Serializer.uuid_of(port)] = port
+
+        node_factory = self.node_factory
+        if node_factory is None:
+            from nodes.registry import NodeFactory
+            node_factory = NodeFactory
+        self.loading = True
+        try:
+            nodes, edges = Serializer.add_to_graph(self.graph, data, node_factory, port_map)
+        finally:
+            self.loading = False
+        if Config.DEBUG:
+            Logger.LogMessage(f"Loaded function body {uuid} ({len(nodes)} nodes)")
+        for listener in self.loaded_listeners:
+            listener(function, nodes, edges)
+        return True
+
+    def load_all(self):
+        for uuid in list(self.pending):
+            self.load(uuid)
+
+    def pending_rects(self):
+        # (uuid, (x0, y0, x1, y1)) of the bodies not read yet, node positions only
+        # (nodes extend right and down from them), the function node included
+        for uuid, node_id in self.pending.items():
+            if uuid in self.failed:
+                continue
+            x0, y0, x1, y1 = self.entries[uuid]["rect"]
+            function = self.graph.nodes.get(node_id)
+            if function is not None:
+                x0, y0 = min(x0, function.x), min(y0, function.y)
+                x1, y1 = max(x1, function.x), max(y1, function.y)
+            yield uuid, (x0, y0, x1, y1)
+
+    def max_z(self) -> float:
+        return max((self.entries[uuid].get("z", 0) for uuid in self.pending), default=0)
+
+    @staticmethod
+    def body_dir(graph_path) -> Path:
+        graph_path = Path(graph_path)
+        return graph_path.with_name(graph_path.stem + FunctionStore.DIR_SUFFIX)
+
+    @staticmethod
+    def body_path(graph_path, uuid: str) -> Path:
+        return FunctionStore.body_dir(graph_path) / f"{uuid}.json"
+
+    @staticmethod
+    def body_of(function: Node) -> Optional[List[Node]]:
+        # the nodes only reachable through the function, breadth first from its ports
+        # so the order is the same every time. None when it cannot be saved apart
+        body = []
+        seen = {function.id}
+        queue = deque([function])
+        while queue:
+            node = queue.popleft()
+            for port in node.inputs:
+                for edge in port.connected_edges:
+                    if not FunctionStore._visit(edge.source.node, seen, body, queue):
+                        return None
+            for port in node.outputs:
+                for edge in port.connected_edges:
+                    if not FunctionStore._visit(edge.target.node, seen, body, queue):
+                        return None
+        return body or None
+
+    @staticmethod
+    def _visit(node: Node, seen, body, queue) -> bool:
+        if node.id in seen:
+            return True
+        if node.node_type in ("start", "function"):
+            return False
+        seen.add(node.id)
+        body.append(node)
+        queue.append(node)
+        return True
+
+    @staticmethod
+    def _body_edges(function: Node, body: List[Node]):
+        # every edge of a body starts in it or at the function, in the order of body_of
+        for node in [function] + body:
+            for port in node.outputs:
+                yield from port.connected_edges
+
+    @staticmethod
+    def body_data(function: Node, body: List[Node]) -> Dict[str, Any]:
+        return {
+            "version": Serializer.VERSION,
+            "function": Serializer.uuid_of(function),
+            "nodes": [Serializer.node_data(node) for node in body],
+            "edges": [
+                {"id": Serializer.uuid_of(edge), "source": Serializer.uuid_of(edge.source), "target": Serializer.uuid_of(edge.target)}
+                for edge in FunctionStore._body_edges(function, body)
+            ],
+        }
+
+    @staticmethod
+    def body_hash(function: Node, body: List[Node]) -> str:
+        # what the script depends on, like ScriptCache.graph_hash: types, properties and
+        # edges by position in the body (the function is -1), not titles or positions
+        digest = hashlib.sha256()
+        index = {function.id: -1}
+        for position, node in enumerate(body):
+            index[node.id] = position
+            digest.update(node.node_type.encode())
+            digest.update(json.dumps(node.properties, sort_keys=True, default=str).encode())
+            digest.update(b"\0")
+        for edge in FunctionStore._body_edges(function, body):
+            source, target = edge.source, edge.target
+            digest.update((
+                f"{index[source.node.id]}.{source.node.outputs.index(source)}>"
+                f"{index[target.node.id]}.{target.node.inputs.index(target)};"
+            ).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def entry(function: Node, body: List[Node]) -> Dict[str, Any]:
+        xs = [node.x for node in body]
+        ys = [node.y for node in body]
+        return {
+            "rect": [min(xs), min(ys), max(xs), max(ys)],
+            "z": max(node.z for node in body),
+            "nodes": len(body),
+            "hash": FunctionStore.body_hash(function, body),
+        }
+
+    @staticmethod
+    def snapshot(graph: Graph, graph_path, graph_view=None, split=False) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        # Serializer.to_data of the graph file and {function uuid: body document} of the
+        # bodies to write next to it. Bodies never read are left as they are on disk
+        store = graph.function_store
+        if store is not None and not split:
+            store.load_all()
+
+        entries = {}
+        bodies = {}
+        exclude = set()
+        if store is not None:
+            for uuid in store.pending:
+                entries[uuid] = store.entries[uuid]
+        if split:
+            for function in graph.get_nodes_of_type("function"):
+                uuid = Serializer.uuid_of(function)
+                if uuid in entries:
+                    continue
+                body = FunctionStore.body_of(function)
+                if body is None:
+                    continue
+                exclude.update(node.id for node in body)
+                bodies[uuid] = FunctionStore.body_data(function, body)
+                entries[uuid] = FunctionStore.entry(function, body)
+
+        data = Serializer.to_data(graph, graph_view, exclude)
+        if entries:
+            data["functions"] = entries
+            if store is None:
+                store = FunctionStore(graph, graph_path, {})
+        if store is not None and store.entries != entries:
+            store.entries = entries
+            graph.mark_dirty() # the script cache hashes split bodies apart
+        return data, bodies
+
+    @staticmethod
+    def write_bodies(graph_path, bodies: Dict[str, Dict[str, Any]], binary=False, compression=None):
+        if not bodies:
+            return
+        FunctionStore.body_dir(graph_path).mkdir(exist_ok=True)
+        for uuid, data in bodies.items():
+            Serializer.write_data(data, FunctionStore.body_path(graph_path, uuid), binary, compression)
+
+    @staticmethod
+    def remove_stale(graph_path, entries: Dict[str, Any]):
+        # after the graph file is written: bodies it no longer lists
+        directory = FunctionStore.body_dir(graph_path)
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if name.endswith(".json") and name[:-len(".json")] not in entries:
+                try:
+                    os.remove(directory / name)
+                except OSError as e:
+                    Logger.LogWarning(f"Could not remove the old function body {name}: {e}")
+        if not entries:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
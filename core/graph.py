@@ -17,24 +17,34 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
-from typing import List, Optional, Dict, Any, TYPE_CHECKING
+import sys
+from itertools import count
+from typing import List, Optional, Dict, Any, Callable, Sequence, TYPE_CHECKING
 if TYPE_CHECKING:
     from core.bash_context import BashContext
-from uuid import uuid4
 from core.port_types import PortType, PortDirection
 from core.logger import Logger
 from core.config import Config
+from core.validator import TopologicalOrder
+
+# Ports, nodes and edges are identified in memory by a dense integer handle.
+# The UUID strings of the project files only live in the uuid slot, filled by
+# the Serializer when a graph is loaded or saved.
+_handles = count(1)
 
 class Port:
+    __slots__ = ("id", "uuid", "name", "port_type", "direction", "node", "value", "connected_edges", "tooltip")
+
     def __init__(self, name: str, port_type: PortType, direction: PortDirection, node: 'Node', tooltip=""):
-        self.id = str(uuid4())
-        self.name = name
+        self.id = next(_handles)
+        self.uuid: Optional[str] = None
+        self.name = sys.intern(name)
         self.port_type = port_type
         self.direction = direction
         self.node = node
         self.value: Any = None
-        self.connected_edges: List['Edge'] = []
-        self.tooltip = tooltip
+        self.connected_edges: Sequence['Edge'] = () # becomes a list on first connection
+        self.tooltip = sys.intern(tooltip)
         
     def can_connect_to(self, other: 'Port') -> bool:
         if self.direction == other.direction:
@@ -53,13 +63,16 @@ class Port:
 
     def get_condition(self, context):
         if self.connected_edges:
-            return self.connected_edges[0].source.node.emit_condition(context)
+            return context.resolve_condition(self.connected_edges[0].source)
         return self.value
     
 class Node:
+    __slots__ = ("id", "uuid", "node_type", "title", "inputs", "outputs", "x", "y", "z", "properties")
+
     def __init__(self, node_type: str, title: str):
-        self.id = str(uuid4())
-        self.node_type = node_type
+        self.id = next(_handles)
+        self.uuid: Optional[str] = None
+        self.node_type = sys.intern(node_type)
         self.title = title
         self.inputs: List[Port] = []
         self.outputs: List[Port] = []
@@ -94,12 +107,22 @@ class Node:
         return ""
 
 class Edge:
+    __slots__ = ("id", "uuid", "source", "target")
+
     def __init__(self, source: Port, target: Port):
-        self.id = str(uuid4())
+        self.id = next(_handles)
+        self.uuid: Optional[str] = None
         self.source = source
         self.target = target
-        source.connected_edges.append(self)
-        target.connected_edges.append(self)
+        Edge._attach(source, self)
+        Edge._attach(target, self)
+
+    @staticmethod
+    def _attach(port: Port, edge: 'Edge'):
+        if port.connected_edges:
+            port.connected_edges.append(edge)
+        else:
+            port.connected_edges = [edge]
     
     def disconnect(self):
         self.source.connected_edges.remove(self)
@@ -107,13 +130,40 @@ class Edge:
 
 class Graph:
     def __init__(self):
-        self.nodes: Dict[str, Node] = {}
-        self.edges: Dict[str, Edge] = {}
+        self.nodes: Dict[int, Node] = {}
+        self.edges: Dict[int, Edge] = {}
+        self.change_listeners: List[Callable] = []
+        # node id -> {neighbour id: number of edges}, kept in sync by every edge operation
+        self.successors: Dict[int, Dict[int, int]] = {}
+        self.predecessors: Dict[int, Dict[int, int]] = {}
+        self.exec_successors: Dict[int, Dict[int, int]] = {}
+        self.topological_order = TopologicalOrder(self)
+        self.nodes_by_type: Dict[str, Dict[int, Node]] = {}
+        # written in the graph file on every save, tells which save a file comes from
+        self.revision: Optional[str] = None
+        # function bodies kept in their own files, read on demand (see core.function_store)
+        self.function_store = None
+
+    def ensure_loaded(self):
+        # for whatever needs every node of the project, not only the ones read so far
+        if self.function_store is not None:
+            self.function_store.load_all()
+
+    def mark_dirty(self, *node_ids: int):
+        # Tells whoever caches data derived from these nodes (ex: BashEmitter) that it is stale
+        for listener in self.change_listeners:
+            listener(node_ids)
     
     def add_node(self, node: Node):
         self.nodes[node.id] = node
+        self.nodes_by_type.setdefault(node.node_type, {})[node.id] = node
+        self.successors.setdefault(node.id, {})
+        self.predecessors.setdefault(node.id, {})
+        self.exec_successors.setdefault(node.id, {})
+        self.topological_order.add_node(node.id)
+        self.mark_dirty(node.id)
     
-    def remove_node(self, node_id: str):
+    def remove_node(self, node_id: int):
         node = self.nodes.get(node_id)
         if not node:
             return
@@ -128,65 +178,119 @@ class Graph:
             self.remove_edge(edge_id)
 
         del self.nodes[node_id]
+        same_type = self.nodes_by_type.get(node.node_type)
+        if same_type is not None:
+            same_type.pop(node_id, None)
+            if not same_type:
+                del self.nodes_by_type[node.node_type]
+        self.successors.pop(node_id, None)
+        self.predecessors.pop(node_id, None)
+        self.exec_successors.pop(node_id, None)
+        self.topological_order.remove_node(node_id)
+        self.mark_dirty(node_id)
+
+    def _link(self, edge: Edge):
+        source_id = edge.source.node.id
+        target_id = edge.target.node.id
+        successors = self.successors.setdefault(source_id, {})
+        successors[target_id] = successors.get(target_id, 0) + 1
+        predecessors = self.predecessors.setdefault(target_id, {})
+        predecessors[source_id] = predecessors.get(source_id, 0) + 1
+        if edge.source.port_type == PortType.EXEC:
+            exec_successors = self.exec_successors.setdefault(source_id, {})
+            exec_successors[target_id] = exec_successors.get(target_id, 0) + 1
+        self.topological_order.add_edge(source_id, target_id)
 
+    def _unlink(self, edge: Edge):
+        source_id = edge.source.node.id
+        target_id = edge.target.node.id
+        Graph._decrement(self.successors, source_id, target_id)
+        Graph._decrement(self.predecessors, target_id, source_id)
+        if edge.source.port_type == PortType.EXEC:
+            Graph._decrement(self.exec_successors, source_id, target_id)
+        self.topological_order.remove_edge(source_id, target_id)
+
+    @staticmethod
+    def _decrement(index: Dict[int, Dict[int, int]], key: int, neighbour: int):
+        neighbours = index.get(key)
+        if not neighbours or neighbour not in neighbours:
+            return
+        if neighbours[neighbour] > 1:
+            neighbours[neighbour] -= 1
+        else:
+            del neighbours[neighbour]
     
     def add_edge(self, source: Port, target: Port) -> Optional[Edge]:
         if not source.can_connect_to(target):
             return None
         edge = Edge(source, target)
         self.edges[edge.id] = edge
+        self._link(edge)
+        self.mark_dirty(source.node.id, target.node.id)
         return edge
     
-    def remove_edge(self, edge_id: str):
+    def remove_edge(self, edge_id: int):
         if edge_id in self.edges:
             edge = self.edges[edge_id]
             edge.disconnect()
             del self.edges[edge_id]
+            self._unlink(edge)
+            self.mark_dirty(edge.source.node.id, edge.target.node.id)
 
-    def update_edge(self, edge_id: str, source: Port, target: Port):
+    def update_edge(self, edge_id: int, source: Port, target: Port):
         if edge_id in self.edges:
             edge = self.edges[edge_id]
             edge.disconnect()
             del self.edges[edge_id]
+            self._unlink(edge)
+            self.mark_dirty(edge.source.node.id, edge.target.node.id)
             edge = Edge(source, target)
             self.edges[edge_id] = edge
+            self._link(edge)
+            self.mark_dirty(source.node.id, target.node.id)
             return edge
 
+    def diff(self, other: 'Graph'):
+        # structural changes from this graph to other, see core.graph_diff
+        from core.graph_diff import GraphDiff
+        return GraphDiff.compare(self, other)
+
+    def apply_patch(self, diff, node_factory=None):
+        diff.apply(self, node_factory)
+
+    def get_nodes_of_type(self, node_type: str) -> List[Node]:
+        return list(self.nodes_by_type.get(node_type, {}).values())
+
     def get_start_node(self) -> Optional[Node]:
-        for node in self.nodes.values():
-            if node.node_type == "start":
-                return node
+        for node in self.nodes_by_type.get("start", {}).values():
+            return node
         return None
     
     def get_execution_order(self):
-        from core.port_types import PortType
-
         visited = set()
         ordered = []
-        start = None
         if Config.DEBUG:
             for node in self.nodes.values():
                 Logger.LogMessage(node.title)
-        for node in self.nodes.values():
-            if node.node_type == "start":
-                start = node
-                break
+        start = self.get_start_node()
 
         if not start:
             return []
 
-        def walk(node):
-            if node.id in visited:
-                return
-            visited.add(node.id)
-            ordered.append(node)
-            for output in node.outputs:
-                if output.port_type != PortType.EXEC:
-                    continue
-
-                for edge in output.connected_edges:
-                    next_node = edge.target.node
-                    walk(next_node)
+        stack = [start.id]
+        while stack:
+            node_id = stack.pop()
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+            ordered.append(self.nodes[node_id])
+            # in port order (exec_successors is in the order edges were connected), and
+            # reversed so successors are still visited in the same order as a recursive walk
+            successors = [
+                edge.target.node.id
+                for output in self.nodes[node_id].outputs if output.port_type == PortType.EXEC
+                for edge in output.connected_edges
+            ]
+            stack.extend(reversed(successors))
 
-        walk(start)
         return ordered
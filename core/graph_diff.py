@@ -0,0 +1,246 @@
+# graph_diff.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from typing import Any, Dict, List, Optional
+from core.graph import Graph
+from core.port_types import PortType
+from core.serializer import Serializer
+
+# Nodes, ports and edges are matched by their uuid (the ids of the project files),
+# so a diff only makes sense between two versions of the same project. Every
+# lookup goes through a dict, comparing or patching is linear in the graph size.
+_MISSING = object()
+
+class GraphDiff:
+    def __init__(self):
+        self.added_nodes: List[Dict[str, Any]] = [] # Serializer.node_data entries
+        self.removed_nodes: List[str] = []
+        self.moved_nodes: Dict[str, Dict[str, float]] = {} # uuid -> {"x", "y", "z"}
+        self.changed_nodes: Dict[str, Dict[str, Any]] = {} # uuid -> {"title"?, "set", "unset"}
+        self.changed_ports: Dict[str, Dict[str, List]] = {} # uuid -> {"inputs", "outputs"}
+        self.added_edges: List[Dict[str, str]] = [] # {"id", "source", "target"}
+        self.removed_edges: List[str] = []
+
+    def is_empty(self) -> bool:
+        return not (
+            self.added_nodes or self.removed_nodes or self.moved_nodes or self.changed_nodes
+            or self.changed_ports or self.added_edges or self.removed_edges
+        )
+
+    def summary(self) -> str:
+        return (
+            f"+{len(self.added_nodes)} -{len(self.removed_nodes)} nodes, "
+            f"{len(self.moved_nodes)} moved, {len(self.changed_nodes)} changed, "
+            f"{len(self.changed_ports)} with new ports, "
+            f"+{len(self.added_edges)} -{len(self.removed_edges)} edges"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "added_nodes": self.added_nodes,
+            "removed_nodes": self.removed_nodes,
+            "moved_nodes": self.moved_nodes,
+            "changed_nodes": self.changed_nodes,
+            "changed_ports": self.changed_ports,
+            "added_edges": self.added_edges,
+            "removed_edges": self.removed_edges,
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> 'GraphDiff':
+        diff = GraphDiff()
+        diff.added_nodes = list(data.get("added_nodes", []))
+        diff.removed_nodes = list(data.get("removed_nodes", []))
+        diff.moved_nodes = dict(data.get("moved_nodes", {}))
+        diff.changed_nodes = dict(data.get("changed_nodes", {}))
+        diff.changed_ports = dict(data.get("changed_ports", {}))
+        diff.added_edges = list(data.get("added_edges", []))
+        diff.removed_edges = list(data.get("removed_edges", []))
+        return diff
+
+    @staticmethod
+    def compare(old: Graph, new: Graph) -> 'GraphDiff':
+        diff = GraphDiff()
+        old_nodes = {Serializer.uuid_of(node): node for node in old.nodes.values()}
+        new_nodes = {Serializer.uuid_of(node): node for node in new.nodes.values()}
+
+        for uuid, node in old_nodes.items():
+            other = new_nodes.get(uuid)
+            # a node changing type under the same id is a replacement
+            if other is None or other.node_type != node.node_type:
+                diff.removed_nodes.append(uuid)
+
+        for uuid, node in new_nodes.items():
+            before = old_nodes.get(uuid)
+            if before is None or before.node_type != node.node_type:
+                diff.added_nodes.append(Serializer.node_data(node))
+                continue
+
+            if (before.x, before.y, before.z) != (node.x, node.y, node.z):
+                diff.moved_nodes[uuid] = {"x": node.x, "y": node.y, "z": node.z}
+
+            changes = GraphDiff.node_changes(before, node)
+            if changes:
+                diff.changed_nodes[uuid] = changes
+
+            inputs = GraphDiff.port_list(node.inputs)
+            outputs = GraphDiff.port_list(node.outputs)
+            if inputs != GraphDiff.port_list(before.inputs) or outputs != GraphDiff.port_list(before.outputs):
+                diff.changed_ports[uuid] = {"inputs": inputs, "outputs": outputs}
+
+        old_edges = {Serializer.uuid_of(edge): GraphDiff.edge_data(edge) for edge in old.edges.values()}
+        new_edges = {Serializer.uuid_of(edge): GraphDiff.edge_data(edge) for edge in new.edges.values()}
+        replaced = set(diff.removed_nodes)
+
+        for uuid, data in old_edges.items():
+            if new_edges.get(uuid) != data or data["source_node"] in replaced or data["target_node"] in replaced:
+                diff.removed_edges.append(uuid)
+
+        removed_edges = set(diff.removed_edges)
+        for uuid, data in new_edges.items():
+            if uuid not in old_edges or uuid in removed_edges:
+                diff.added_edges.append({"id": uuid, "source": data["source"], "target": data["target"]})
+        return diff
+
+    def apply(self, graph: Graph, node_factory=None):
+        if node_factory is None:
+            from nodes.registry import NodeFactory
+            node_factory = NodeFactory
+
+        nodes = {Serializer.uuid_of(node): node for node in graph.nodes.values()}
+        edges = {Serializer.uuid_of(edge): edge for edge in graph.edges.values()}
+
+        # everything is checked before the graph is touched, a bad patch leaves it as it was
+        added_uuids = {data["id"] for data in self.added_nodes}
+        for uuid in self.removed_nodes:
+            GraphDiff._require(nodes, uuid, "node")
+        for uuid in self.removed_edges:
+            GraphDiff._require(edges, uuid, "edge")
+        for uuid in list(self.moved_nodes) + list(self.changed_nodes) + list(self.changed_ports):
+            if uuid not in added_uuids:
+                GraphDiff._require(nodes, uuid, "node")
+
+        for uuid in self.removed_edges:
+            graph.remove_edge(edges[uuid].id)
+
+        for uuid in self.removed_nodes:
+            graph.remove_node(nodes.pop(uuid).id)
+
+        for data in self.added_nodes:
+            node = Serializer.build_node(data, node_factory)
+            node.properties = dict(node.properties)
+            GraphDiff._set_ports(node, "inputs", data.get("inputs", []))
+            GraphDiff._set_ports(node, "outputs", data.get("outputs", []))
+            graph.add_node(node)
+            nodes[node.uuid] = node
+
+        for uuid, ports in self.changed_ports.items():
+            node = nodes[uuid]
+            GraphDiff._set_ports(node, "inputs", ports["inputs"])
+            GraphDiff._set_ports(node, "outputs", ports["outputs"])
+            graph.mark_dirty(node.id)
+
+        for uuid, position in self.moved_nodes.items():
+            node = nodes[uuid]
+            node.x = position["x"]
+            node.y = position["y"]
+            node.z = position.get("z", node.z)
+
+        for uuid, changes in self.changed_nodes.items():
+            node = nodes[uuid]
+            if "title" in changes:
+                node.title = changes["title"]
+            node.properties.update(changes.get("set", {}))
+            for key in changes.get("unset", []):
+                node.properties.pop(key, None)
+            graph.mark_dirty(node.id)
+
+        if self.added_edges:
+            ports = {}
+            for node in nodes.values():
+                for port in node.inputs:
+                    ports[Serializer.uuid_of(port)] = port
+                for port in node.outputs:
+                    ports[Serializer.uuid_of(port)] = port
+
+            for data in self.added_edges:
+                source = ports.get(data["source"])
+                target = ports.get(data["target"])
+                if source is None or target is None:
+                    raise ValueError(f"Edge {data['id']} references a port that is not in the graph")
+                edge = graph.add_edge(source, target)
+                if edge is None:
+                    raise ValueError(f"Edge {data['id']} connects incompatible ports")
+                edge.uuid = data["id"]
+
+    @staticmethod
+    def _require(items, uuid, kind):
+        if uuid not in items:
+            raise ValueError(f"Patch references unknown {kind} {uuid}")
+
+    @staticmethod
+    def node_changes(before, node) -> Optional[Dict[str, Any]]:
+        changes: Dict[str, Any] = {}
+        if before.title != node.title:
+            changes["title"] = node.title
+
+        changed = {
+            key: value for key, value in node.properties.items()
+            if before.properties.get(key, _MISSING) != value
+        }
+        unset = [key for key in before.properties if key not in node.properties]
+        if changed or unset:
+            changes["set"] = changed
+            changes["unset"] = unset
+        return changes or None
+
+    @staticmethod
+    def port_list(ports) -> List[Dict[str, str]]:
+        return [
+            {"id": Serializer.uuid_of(p), "name": p.name, "type": p.port_type.value}
+            for p in ports
+        ]
+
+    @staticmethod
+    def edge_data(edge) -> Dict[str, str]:
+        return {
+            "source": Serializer.uuid_of(edge.source),
+            "target": Serializer.uuid_of(edge.target),
+            "source_node": Serializer.uuid_of(edge.source.node),
+            "target_node": Serializer.uuid_of(edge.target.node),
+        }
+
+    @staticmethod
+    def _set_ports(node, side, saved):
+        # keeps the ports that are still there (and so their edges), creates the
+        # dynamic ones a node added since, drops the ones it removed
+        ports = getattr(node, side)
+        existing = {Serializer.uuid_of(port): port for port in ports}
+        add = node.add_input if side == "inputs" else node.add_output
+        result = []
+        for data in saved:
+            port = existing.get(data["id"])
+            if port is None:
+                port = add(data["name"], PortType(data["type"]))
+                port.uuid = data["id"]
+                ports.pop() # add_* appended it, the order comes from the saved list
+            else:
+                port.name = data["name"]
+            result.append(port)
+        ports[:] = result
@@ -0,0 +1,306 @@
+# journal.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+from core.graph import Graph
+from core.graph_diff import GraphDiff
+from core.logger import Logger
+from core.config import Config
+from core.serializer import Serializer
+
+class _NodeState:
+    # what the journal last wrote about a node
+    __slots__ = ("uuid", "title", "properties", "x", "y", "z", "inputs", "outputs", "edges")
+
+    def __init__(self, node):
+        self.uuid = Serializer.uuid_of(node)
+        self.edges: Set[int] = set()
+        self.update(node)
+
+    def update(self, node):
+        self.title = node.title
+        self.properties = dict(node.properties)
+        self.x, self.y, self.z = node.x, node.y, node.z
+        self.inputs = GraphDiff.port_list(node.inputs)
+        self.outputs = GraphDiff.port_list(node.outputs)
+
+class GraphJournal:
+    # Auto-save log of a project graph. Instead of rewriting the graph file on every
+    # change, the nodes touched since the last flush are compared to what the journal
+    # already knows and the difference is appended as one line: a GraphDiff (added,
+    # removed, moved and changed nodes, connected and disconnected edges), plus the
+    # comments when they changed.
+    #
+    # Header lines name the graph file the records after them apply to (its revision,
+    # see Graph.revision), a journal left behind by a crash is only replayed from the
+    # header of the file actually on disk. Saves run in the background: checkpoint()
+    # marks where a save was taken, saved() drops what that save made redundant.
+    SUFFIX = ".journal"
+    FLUSH_DELAY_MS = 500 # changes are written at most that long after they happen
+    COMPACT_RECORDS = 200
+    COMPACT_SECONDS = 60
+
+    def __init__(self, graph: Graph, graph_path: Path, recovered=0):
+        # recovered: records replay() applied, the journal keeps growing from there
+        self.graph = graph
+        self.graph_path = Path(graph_path)
+        self.path = self.graph_path.with_suffix(GraphJournal.SUFFIX)
+        self.records = recovered
+        self._dirty: Set[int] = set()
+        self._comments_changed = False
+        self._nodes: Dict[int, _NodeState] = {}
+        self._edges: Dict[int, Tuple[str, int, int]] = {} # handle -> (uuid, source node, target node)
+        self._written_base = GraphJournal.base_of(graph, self.graph_path) # the graph file on disk
+        self._base = self._written_base if recovered else None # header of the journal file, None before it exists
+        self._saving = None # revision being written in the background
+        for node in graph.nodes.values():
+            self._nodes[node.id] = _NodeState(node)
+        for edge in graph.edges.values():
+            self._know_edge(edge)
+        graph.change_listeners.append(self._graph_changed)
+
+    def _graph_changed(self, node_ids):
+        self._dirty.update(node_ids)
+
+    def node_moved(self, node):
+        # positions are not part of the graph change notifications
+        self._dirty.add(node.id)
+
+    def comments_changed(self):
+        self._comments_changed = True
+
+    def loaded(self, function, nodes, edges):
+        # a function body read from its own file (core.function_store) is not a change
+        for node in nodes:
+            self._nodes[node.id] = _NodeState(node)
+        for edge in edges:
+            self._know_edge(edge)
+
+    def has_changes(self) -> bool:
+        return bool(self._dirty) or self._comments_changed
+
+    def _know_edge(self, edge):
+        source_id, target_id = edge.source.node.id, edge.target.node.id
+        self._edges[edge.id] = (Serializer.uuid_of(edge), source_id, target_id)
+        for node_id in (source_id, target_id):
+            state = self._nodes.get(node_id)
+            if state:
+                state.edges.add(edge.id)
+
+    def _forget_edge(self, handle, diff: GraphDiff):
+        uuid, source_id, target_id = self._edges.pop(handle)
+        diff.removed_edges.append(uuid)
+        for node_id in (source_id, target_id):
+            state = self._nodes.get(node_id)
+            if state:
+                state.edges.discard(handle)
+
+    def collect(self) -> GraphDiff:
+        # linear in the number of changed nodes and their edges
+        diff = GraphDiff()
+        dirty, self._dirty = self._dirty, set()
+        present = []
+
+        for node_id in dirty:
+            node = self.graph.nodes.get(node_id)
+            state = self._nodes.get(node_id)
+            if node is None:
+                if state is not None:
+                    for handle in list(state.edges):
+                        self._forget_edge(handle, diff)
+                    diff.removed_nodes.append(state.uuid)
+                    del self._nodes[node_id]
+                continue
+
+            if state is None:
+                self._nodes[node_id] = _NodeState(node)
+                diff.added_nodes.append(Serializer.node_data(node))
+            else:
+                if (state.x, state.y, state.z) != (node.x, node.y, node.z):
+                    diff.moved_nodes[state.uuid] = {"x": node.x, "y": node.y, "z": node.z}
+                changes = GraphDiff.node_changes(state, node)
+                if changes:
+                    diff.changed_nodes[state.uuid] = changes
+                inputs = GraphDiff.port_list(node.inputs)
+                outputs = GraphDiff.port_list(node.outputs)
+                if inputs != state.inputs or outputs != state.outputs:
+                    diff.changed_ports[state.uuid] = {"inputs": inputs, "outputs": outputs}
+                state.update(node)
+            present.append(node)
+
+        # edges last, so both ends of a new edge are known by then
+        for node in present:
+            state = self._nodes[node.id]
+            current = {}
+            for port in node.inputs:
+                for edge in port.connected_edges:
+                    current[edge.id] = edge
+            for port in node.outputs:
+                for edge in port.connected_edges:
+                    current[edge.id] = edge
+
+            for handle in list(state.edges):
+                edge = current.get(handle)
+                # update_edge keeps the handle but makes a new Edge without a uuid
+                if edge is None or edge.uuid != self._edges[handle][0]:
+                    self._forget_edge(handle, diff)
+
+            for handle, edge in current.items():
+                if handle not in self._edges:
+                    self._know_edge(edge)
+                    diff.added_edges.append({
+                        "id": edge.uuid,
+                        "source": Serializer.uuid_of(edge.source),
+                        "target": Serializer.uuid_of(edge.target),
+                    })
+        return diff
+
+    def flush(self, comments_data=None) -> bool:
+        # comments_data: returns the current comments, only called when they changed
+        diff = self.collect()
+        comments_changed, self._comments_changed = self._comments_changed, False
+        if diff.is_empty() and not (comments_changed and comments_data):
+            return False
+
+        record = {key: value for key, value in diff.to_dict().items() if value}
+        if comments_changed and comments_data:
+            record["comments"] = comments_data()
+        try:
+            if self._base is None or not self.path.exists():
+                self._start()
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+            self.records += 1
+        except OSError as e:
+            Logger.LogWarning(f"Could not write the auto-save journal: {e}")
+            return False
+        if Config.DEBUG:
+            Logger.LogMessage(f"Journal: {diff.summary()}")
+        return True
+
+    def _start(self):
+        # the journal applies on top of the file on disk, and when a save is being
+        # written, also on top of that one (replay skips the headers it does not need)
+        lines = [json.dumps({"base": self._written_base})]
+        if self._saving:
+            lines.append(json.dumps({"base": {"revision": self._saving}}))
+        with open(self.path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        self._base = self._written_base
+        self.records = 0
+
+    def checkpoint(self, revision: str):
+        # a save of the current graph as `revision` was handed to the background writer:
+        # what comes after belongs on top of it
+        self.collect()
+        self._comments_changed = False
+        self._saving = revision
+        if self._base is not None and self.path.exists():
+            try:
+                with open(self.path, "a") as f:
+                    f.write(json.dumps({"base": {"revision": revision}}) + "\n")
+            except OSError as e:
+                Logger.LogWarning(f"Could not write the auto-save journal: {e}")
+
+    def saved(self, revision: str, ok: bool):
+        # the background writer finished the save made at checkpoint(revision)
+        if self._saving == revision:
+            self._saving = None
+        if not ok:
+            return
+        self._written_base = {"revision": revision}
+        try:
+            with open(self.path, "r") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            Logger.LogWarning(f"Could not read the auto-save journal: {e}")
+            return
+
+        header = json.dumps({"base": self._written_base})
+        if header not in lines:
+            return
+        kept = lines[lines.index(header) + 1:]
+        try:
+            if not kept:
+                os.remove(self.path)
+                self._base = None
+                self.records = 0
+                return
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w") as f:
+                f.write("\n".join([header] + kept) + "\n")
+            os.replace(tmp_path, self.path)
+            self._base = self._written_base
+            self.records = len(kept)
+        except OSError as e:
+            Logger.LogWarning(f"Could not compact the auto-save journal: {e}")
+
+    @staticmethod
+    def base_of(graph: Graph, graph_path: Path):
+        # files saved by the editor carry a revision, older ones are known by size and mtime
+        if graph.revision:
+            return {"revision": graph.revision}
+        stat = os.stat(graph_path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    @staticmethod
+    def replay(graph: Graph, graph_path: Path, node_factory=None) -> Tuple[int, Optional[list]]:
+        # applies a journal left by a session that did not compact it,
+        # returns the number of records applied and the last comments it had
+        path = Path(graph_path).with_suffix(GraphJournal.SUFFIX)
+        applied = 0
+        comments = None
+        try:
+            with open(path, "r") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return 0, None
+        except OSError as e:
+            Logger.LogWarning(f"Could not read the auto-save journal: {e}")
+            return 0, None
+
+        header = json.dumps({"base": GraphJournal.base_of(graph, Path(graph_path))})
+        if header not in lines:
+            Logger.LogWarning(f"Ignoring auto-save journal {path}, it was written for another version of the graph")
+            return 0, None
+
+        records = lines[lines.index(header) + 1:]
+        if records:
+            graph.ensure_loaded() # records can touch function bodies not read yet
+        for line in records:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break # the line being written when the session ended
+            if "base" in record:
+                continue # a save that was started after this one
+            try:
+                GraphDiff.from_dict(record).apply(graph, node_factory)
+            except ValueError as e:
+                Logger.LogWarning(f"Stopped replaying the auto-save journal: {e}")
+                break
+            if "comments" in record:
+                comments = record["comments"]
+            applied += 1
+        return applied, comments
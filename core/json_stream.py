@@ -0,0 +1,137 @@
+# json_stream.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import codecs
+import json
+import os
+import re
+from typing import Any, Callable, Iterator, Optional
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = frozenset(".eE+-0123456789")
+
+# Pull parser for huge json files: the top level object is walked key by key and
+# big arrays are handed out one element at a time, so only the element being
+# parsed (and the chunk around it) is ever held in memory. Elements themselves are
+# parsed by the stdlib decoder.
+class JsonStream:
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, f, progress: Optional[Callable[[int, int], None]] = None, raw=None):
+        # raw: the file on disk when f decompresses it, progress is measured in its bytes
+        self._file = f # opened in binary mode
+        self._raw = raw or f
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self.bytes_read = 0
+        try:
+            self.total_bytes = os.fstat(self._raw.fileno()).st_size
+        except (AttributeError, OSError, ValueError):
+            self.total_bytes = 0
+        self._progress = progress
+
+    def _fill(self, size=None) -> bool:
+        if self._eof:
+            return False
+        raw = self._file.read(size or JsonStream.CHUNK_SIZE)
+        self.bytes_read += len(raw)
+        self._eof = not raw
+        self._buffer = self._buffer[self._pos:] + self._decoder.decode(raw, final=self._eof)
+        self._pos = 0
+        if self._progress:
+            done = self._raw.tell() if self._raw is not self._file else self.bytes_read
+            self._progress(done, max(self.total_bytes, done))
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str):
+        found = self._peek()
+        if found != char:
+            self._invalid(f"'{char}'", found)
+        self._pos += 1
+
+    def _invalid(self, expected: str, found: str):
+        raise ValueError(f"Invalid JSON: expected {expected} at byte {self.bytes_read}, found '{found or 'end of file'}'")
+
+    def value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # an incomplete value at the end of the chunk, read more (doubling so a
+                # single huge value is not parsed again for every chunk)
+                if self._fill(max(JsonStream.CHUNK_SIZE, len(self._buffer) - self._pos)):
+                    continue
+                raise
+            # a number can stop exactly at the end of the chunk and still go on in the next
+            # one, or stop short of it when the chunk ends after a '.', an exponent or a sign
+            # ("1." decodes as 1 followed by '.')
+            if end == len(self._buffer) or (
+                type(value) in (int, float) and self._buffer[end] in _NUMBER_CHARS
+            ):
+                if self._fill():
+                    continue
+            self._pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        # yields the keys of an object, the caller has to read each value
+        # with value() or items() before asking for the next key
+        # (a comma is always followed by another member, like json.load)
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            found = self._peek()
+            if found != '"':
+                self._invalid("a key", found)
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._peek() == "}":
+                self._pos += 1
+                return
+            self._expect(",")
+
+    def items(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            found = self._peek()
+            if found == "]":
+                self._invalid("a value", found)
+            yield self.value()
+            if self._peek() == "]":
+                self._pos += 1
+                return
+            self._expect(",")
@@ -55,7 +55,7 @@ class GraphLayoutEngine:
         self.graph=graph
         self.x_spacing=int(x_spacing)
         self.y_spacing=int(y_spacing)
-        self.nodes:Dict[str,_LNode]={}
+        self.nodes:Dict[int,_LNode]={}
         self.edges:List[_LEdge]=[]
 
     def compute(self)->Dict[str,Tuple[int,int]]:
@@ -0,0 +1,86 @@
+# project_saver.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import threading
+from PySide6.QtCore import QObject, Signal
+from core.config import Config
+from core.logger import Logger
+from core.function_store import FunctionStore
+from core.script_cache import ScriptCache
+from core.serializer import Serializer
+
+class ProjectSaver(QObject):
+    # Encodes and writes graph files on a worker thread. The UI thread only takes the
+    # snapshot (Serializer.to_data, plain dicts that no longer change with the graph).
+    # While a file is being written, new requests replace each other: only the last
+    # one is written after it, the ones in between would be overwritten anyway.
+    saved = Signal(str, str, str, bool) # path, revision, error ("" when saved), show a message
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._pending = None
+        self._thread = None
+
+    def save(self, data, path, binary: bool, revision: str, msg=False, compression=None, bodies=None, script=None):
+        # bodies: function bodies saved apart that were read, see FunctionStore.snapshot
+        # script: ScriptCache.to_save, the generated script to cache next to the project
+        with self._lock:
+            if self._pending is not None:
+                # coalesced: the older snapshot is never written, its message is kept
+                msg = msg or self._pending[4]
+            self._pending = (data, str(path), binary, revision, msg, compression, bodies, script)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="vish-save", daemon=True)
+                self._thread.start()
+
+    def is_busy(self) -> bool:
+        with self._lock:
+            return self._thread is not None
+
+    def wait(self):
+        # on exit, a save still running must not be cut by the interpreter shutting down
+        with self._lock:
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                job, self._pending = self._pending, None
+                if job is None:
+                    self._thread = None
+                    return
+            data, path, binary, revision, msg, compression, bodies, script = job
+            error = ""
+            try:
+                # the bodies first, the graph file only lists them once they are all there
+                FunctionStore.write_bodies(path, bodies, binary, compression)
+                Serializer.write_data(data, path, binary, compression)
+                FunctionStore.remove_stale(path, data.get("functions", {}))
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+                Logger.LogError(f"Could not save {path}: {error}")
+            if script is not None and not error:
+                project_dir, text, settings = script
+                ScriptCache.write(project_dir, data, text, settings)
+            if Config.DEBUG and not error:
+                Logger.LogMessage(f"Saved {path} in the background ({len(data['nodes'])} nodes)")
+            self.saved.emit(path, revision, error, msg)
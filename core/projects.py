@@ -21,6 +21,8 @@ from pathlib import Path
 from datetime import datetime, timezone
 import json
 from core.debug import Info
+from core.binary_format import BinaryFormat, MAGIC
+from core.compression import Compression, HEAD_SIZE, NONE
 from core.logger import Logger
 
 class Project:
@@ -109,6 +111,47 @@ class ProjectManager:
             raise RuntimeError("No project loaded")
         return self.current_project_path / self.project_data["graph_file"]
 
+    def graph_format(self) -> str:
+        # read from the magic bytes, a project is saved back in the format it was loaded from
+        try:
+            _, head = Compression.read_head(self.get_graph_path(), len(MAGIC))
+            return "binary" if BinaryFormat.is_binary(head) else "json"
+        except (OSError, RuntimeError, ValueError):
+            return "json"
+
+    def graph_compression(self) -> str:
+        # codec of the graph file on disk
+        try:
+            with open(self.get_graph_path(), "rb") as f:
+                return Compression.detect(f.read(HEAD_SIZE))
+        except (OSError, RuntimeError):
+            return NONE
+
+    def get_compression(self) -> str:
+        # the "compression" setting of project.json, projects without it keep what their file uses
+        setting = (self.project_data or {}).get("compression")
+        if setting in Compression.NAMES:
+            return setting
+        if setting is not None:
+            Logger.LogWarning(f"Unknown compression '{setting}' in project.json, keeping the one of the graph file")
+        return self.graph_compression()
+
+    def set_compression(self, name: str):
+        if not self.current_project_path or not self.project_data:
+            raise RuntimeError("No project loaded")
+        self.project_data["compression"] = Compression.check(name)
+        self._write_project_json(self.current_project_path)
+
+    def get_split_functions(self) -> bool:
+        # "split_functions" of project.json: function bodies saved in their own files
+        return bool((self.project_data or {}).get("split_functions", False))
+
+    def set_split_functions(self, split: bool):
+        if not self.current_project_path or not self.project_data:
+            raise RuntimeError("No project loaded")
+        self.project_data["split_functions"] = bool(split)
+        self._write_project_json(self.current_project_path)
+
     def get_project_path(self) -> Path | None:
         return self.current_project_path
 
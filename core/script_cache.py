@@ -0,0 +1,199 @@
+# script_cache.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from core.config import Config
+from core.function_store import FunctionStore
+from core.graph import Graph
+from core.logger import Logger
+from core.serializer import Serializer
+
+class ScriptCache:
+    # The last generated script of a graph, saved in the project directory so opening
+    # an unchanged project does not need a full generation. Entries are keyed by a hash
+    # of everything the script depends on: the graph content (positions excluded), the
+    # emitter settings, Serializer.VERSION and the source of the emitter and node modules.
+    #
+    # Hashing the graph costs about as much as an incremental generation, so it is only
+    # done where it saves one: once after opening, to check the saved entry. Once the
+    # graph has changed the cache is never hit again in the session, and the key of the
+    # script written at save time is computed from the save snapshot on the saver thread.
+    FILE_NAME = "script_cache.json"
+    EMITTER_MODULES = ("core.bash_emitter", "core.bash_context", "core.emit_cache", "core.graph")
+    _emitter_fingerprint = None
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        self._graph_hash = None
+        self._changed = False # since the graph was loaded
+        self._entry = None # (key, script), key None when only known at save time
+        self._settings = None # ScriptCache.settings() of the script in _entry
+        self._current = False # _entry holds the script of the graph as it is now
+        graph.change_listeners.append(self._graph_changed)
+
+    def _graph_changed(self, node_ids):
+        store = self.graph.function_store
+        if store is not None and store.loading:
+            return # a function body read from its file, the hash covers it either way
+        self._graph_hash = None
+        self._changed = True
+        self._current = False
+
+    def key(self) -> str:
+        if self._graph_hash is None:
+            self._graph_hash = ScriptCache.graph_hash(self.graph)
+        return ScriptCache.make_key(self._graph_hash, ScriptCache.settings())
+
+    def get(self) -> Optional[str]:
+        if self._changed or not self._entry or self._entry[0] is None:
+            return None
+        if self._entry[0] == self.key():
+            return self._entry[1]
+        return None
+
+    def put(self, script: str):
+        self._entry = (None if self._changed else self.key(), script)
+        self._settings = ScriptCache.settings()
+        self._current = True
+
+    def load(self, project_dir: Path):
+        try:
+            with open(Path(project_dir) / ScriptCache.FILE_NAME, "r") as f:
+                data = json.load(f)
+            self._entry = (data["key"], data["script"])
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            Logger.LogWarning(f"Ignoring unreadable script cache: {e}")
+
+    def to_save(self, project_dir: Path):
+        # (project_dir, script, settings) for ProjectSaver when the script matches the
+        # graph about to be saved, taken before FunctionStore.snapshot which may mark it dirty
+        if not self._current:
+            return None
+        return str(project_dir), self._entry[1], self._settings
+
+    @staticmethod
+    def settings() -> List[str]:
+        return [ScriptCache.emitter_fingerprint(), Serializer.VERSION,
+                str(Config.OPTIMIZE_SCRIPT), Config.CUSTOM_SHEBANG]
+
+    @staticmethod
+    def make_key(graph_hash: str, settings: List[str]) -> str:
+        key = hashlib.sha256()
+        for part in [graph_hash] + settings:
+            key.update(part.encode())
+            key.update(b"\0")
+        return key.hexdigest()
+
+    @staticmethod
+    def write(project_dir, data: Dict[str, Any], script: str, settings: List[str]):
+        # on the saver thread, data is the snapshot that was saved (Serializer.to_data)
+        path = Path(project_dir) / ScriptCache.FILE_NAME
+        tmp_path = path.with_name(path.name + ".tmp")
+        key = ScriptCache.make_key(ScriptCache.data_hash(data), settings)
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"key": key, "script": script}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            Logger.LogWarning(f"Could not write script cache: {e}")
+
+    @staticmethod
+    def data_hash(data: Dict[str, Any]) -> str:
+        # graph_hash of the graph a snapshot was taken from, computed from the snapshot
+        digest = hashlib.sha256()
+        ports = {}
+        for position, node in enumerate(data["nodes"]):
+            digest.update(node["type"].encode())
+            digest.update(json.dumps(node.get("properties", {}), sort_keys=True, default=str).encode())
+            digest.update(b"\0")
+            for i, port in enumerate(node.get("inputs", ())):
+                ports[port["id"]] = f"{position}.{i}"
+            for i, port in enumerate(node.get("outputs", ())):
+                ports[port["id"]] = f"{position}.{i}"
+        for edge in data["edges"]:
+            digest.update(f"{ports[edge['source']]}>{ports[edge['target']]};".encode())
+        functions = data.get("functions", {})
+        for uuid in sorted(functions):
+            digest.update(f"{uuid}:{functions[uuid]['hash']};".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def graph_hash(graph: Graph) -> str:
+        # nodes are numbered by their order in the graph since ids are per session,
+        # that order is also the order functions are emitted in. Must stay in step
+        # with data_hash
+        digest = hashlib.sha256()
+        store = graph.function_store
+        bodies = {} # function bodies saved apart are hashed on their own, read or not
+        exclude = set()
+        if store is not None and store.entries:
+            for function in graph.get_nodes_of_type("function"):
+                if function.uuid in store.entries and function.uuid not in store.pending:
+                    body = FunctionStore.body_of(function)
+                    if body is not None:
+                        bodies[function.uuid] = FunctionStore.body_hash(function, body)
+                        exclude.update(node.id for node in body)
+            for uuid in store.pending:
+                bodies[uuid] = store.entries[uuid]["hash"]
+
+        index = {}
+        for node in graph.nodes.values():
+            if node.id in exclude:
+                continue
+            index[node.id] = len(index)
+            digest.update(node.node_type.encode())
+            digest.update(json.dumps(node.properties, sort_keys=True, default=str).encode())
+            digest.update(b"\0")
+        for edge in graph.edges.values():
+            source, target = edge.source, edge.target
+            if exclude and (source.node.id in exclude or target.node.id in exclude):
+                continue
+            digest.update((
+                f"{index[source.node.id]}.{source.node.outputs.index(source)}>"
+                f"{index[target.node.id]}.{target.node.inputs.index(target)};"
+            ).encode())
+        for uuid in sorted(bodies):
+            digest.update(f"{uuid}:{bodies[uuid]};".encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def emitter_fingerprint() -> str:
+        if ScriptCache._emitter_fingerprint is None:
+            digest = hashlib.sha256()
+            names = sorted(
+                name for name in sys.modules
+                if name in ScriptCache.EMITTER_MODULES or name.startswith("nodes.")
+            )
+            for name in names:
+                digest.update(name.encode())
+                path = getattr(sys.modules[name], "__file__", None)
+                try:
+                    with open(path, "rb") as f:
+                        digest.update(f.read())
+                except (OSError, TypeError):
+                    pass # no source (frozen build), Serializer.VERSION still tells releases apart
+            ScriptCache._emitter_fingerprint = digest.hexdigest()
+        return ScriptCache._emitter_fingerprint
@@ -17,13 +17,34 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import functools
+import gc
 import json
+import os
 from typing import Any, Dict
+from uuid import uuid4
 from core.debug import Info
+from core.json_stream import JsonStream
+from core.binary_format import BinaryFormat, BinaryReader, MAGIC
+from core.compression import Compression, HEAD_SIZE, NONE
 from core.logger import Logger
 from .graph import Graph, Node, Port
 
 
+def _gc_paused(function):
+    # a load allocates hundreds of thousands of objects that all stay alive, the
+    # cyclic collector would keep rescanning them while the graph is being built
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if enabled:
+                gc.enable()
+    return wrapper
+
 class Serializer:
     try:
         version_path = Info.resource_path(f"VERSION")
@@ -38,44 +59,100 @@ class Serializer:
         self.graph = graph
 
     @staticmethod
-    def serialize(graph: Graph, graph_view) -> str:
-        # Viewport
-        center = graph_view.mapToScene(graph_view.viewport().rect().center())
+    def uuid_of(item) -> str:
+        # nodes, ports and edges only get a UUID when they are first written to disk
+        if item.uuid is None:
+            item.uuid = str(uuid4())
+        return item.uuid
 
-        data = {"version": Serializer.VERSION, "nodes": [], "edges": [], "comments": [], "viewport_pos": {"x": center.x(), "y": center.y(), "zoom": graph_view.scale_factor}}
+    @staticmethod
+    def serialize(graph: Graph, graph_view=None) -> str:
+        return json.dumps(Serializer.to_data(graph, graph_view), indent=2)
+
+    @staticmethod
+    def serialize_binary(graph: Graph, graph_view=None) -> bytes:
+        return BinaryFormat.encode(Serializer.to_data(graph, graph_view))
+
+    @staticmethod
+    def write_file(graph: Graph, path, graph_view=None, binary=False, compression=None):
+        Serializer.write_data(Serializer.to_data(graph, graph_view), path, binary, compression)
+
+    @staticmethod
+    def write_data(data: Dict[str, Any], path, binary=False, compression=None):
+        # written next to the file then renamed over it, a crash never leaves half a graph
+        if binary:
+            content = BinaryFormat.encode(data)
+        else:
+            content = json.dumps(data, indent=2).encode("utf-8")
+        content = Compression.compress(content, compression)
+        path = os.fspath(path)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def is_binary_file(path) -> bool:
+        try:
+            return BinaryFormat.is_binary(Compression.read_head(path, len(MAGIC))[1])
+        except (OSError, ValueError):
+            return False
+
+    @staticmethod
+    def compression_of(path) -> str:
+        try:
+            with open(path, "rb") as f:
+                return Compression.detect(f.read(HEAD_SIZE))
+        except OSError:
+            return NONE
+
+    @staticmethod
+    def to_data(graph: Graph, graph_view=None, exclude=()) -> Dict[str, Any]:
+        # exclude: ids of nodes left out with their edges (function bodies saved apart)
+        # Viewport, without a view (headless tools) the default one is written and there are no comments
+        viewport_pos = {"x": 0, "y": 0, "zoom": 1.0}
+        if graph_view is not None:
+            center = graph_view.mapToScene(graph_view.viewport().rect().center())
+            viewport_pos = {"x": center.x(), "y": center.y(), "zoom": graph_view.scale_factor}
+
+        data = {"version": Serializer.VERSION, "nodes": [], "edges": [], "comments": [], "viewport_pos": viewport_pos}
+        if graph.revision:
+            data["revision"] = graph.revision
 
         for node in graph.nodes.values():
-            node_data = {
-                "id": node.id,
-                "type": node.node_type,
-                "title": node.title,
-                "x": node.x,
-                "y": node.y,
-                "z": node.z,
-                "properties": node.properties,
-                "inputs": [
-                    {"id": p.id, "name": p.name, "type": p.port_type.value}
-                    for p in node.inputs
-                ],
-                "outputs": [
-                    {"id": p.id, "name": p.name, "type": p.port_type.value}
-                    for p in node.outputs
-                ],
-            }
-            data["nodes"].append(node_data)
+            if node.id not in exclude:
+                data["nodes"].append(Serializer.node_data(node))
 
         for edge in graph.edges.values():
+            if exclude and (edge.source.node.id in exclude or edge.target.node.id in exclude):
+                continue
             edge_data = {
-                "id": edge.id,
-                "source": edge.source.id,
-                "target": edge.target.id,
+                "id": Serializer.uuid_of(edge),
+                "source": Serializer.uuid_of(edge.source),
+                "target": Serializer.uuid_of(edge.target),
             }
             data["edges"].append(edge_data)
 
-        for item in graph_view.graph_scene.items():
+        data["comments"] = Serializer.comments_data(graph_view)
+
+        return data
+
+    @staticmethod
+    def comments_data(graph_view=None):
+        comments = []
+        for item in graph_view.graph_scene.items() if graph_view is not None else ():
             if item.__class__.__name__ == "CommentBoxItem":
                 r = item.rect()
-                data["comments"].append(
+                comments.append(
                     {
                         "x": item.pos().x(),
                         "y": item.pos().y(),
@@ -90,45 +167,229 @@ class Serializer:
                         "move_children": item.move_children
                     }
                 )
-
-        return json.dumps(data, indent=2)
+        return comments
 
     @staticmethod
     def deserialize(json_str: str, node_factory) -> Graph:
-        data = json.loads(json_str)
+        return Serializer.from_data(json.loads(json_str), node_factory)
+
+    @staticmethod
+    @_gc_paused
+    def deserialize_binary(raw: bytes, node_factory, path=None) -> Graph:
+        # builds the graph from the records directly, edges find their ports by index.
+        # path: where the file was read, to find function bodies saved apart
+        reader = BinaryReader(raw)
         graph = Graph()
-        port_map = {}
+        ports = []
 
-        for node_data in data["nodes"]:
-            node = node_factory.create_node(node_data["type"])
+        for node_id, node_type, title, x, y, z, properties, inputs, outputs in reader.nodes():
+            node = node_factory.create_node(
+                node_type, node_id, [saved[0] for saved in inputs], [saved[0] for saved in outputs]
+            )
             if node is None:
-                raise ValueError(
-                    (f"Unknown node type: {node_data['type']}", node_data["type"])
+                raise ValueError((f"Unknown node type: {node_type}", node_type))
+            node.title = title
+            node.x = x
+            node.y = y
+            node.z = z if z is not None else 0
+            node.properties = properties
+            graph.add_node(node)
+
+            if len(inputs) == len(node.inputs) and len(outputs) == len(node.outputs):
+                ports.append(node.inputs + node.outputs)
+            else: # saved with other ports than the node has now, edges to the missing ones are dropped
+                ports.append(
+                    [node.inputs[i] if i < len(node.inputs) else None for i in range(len(inputs))] +
+                    [node.outputs[i] if i < len(node.outputs) else None for i in range(len(outputs))]
                 )
 
-            node.id = node_data["id"]
-            node.title = node_data["title"]
-            node.x = node_data["x"]
-            node.y = node_data["y"]
-            node.z = node_data.get("z", 0) # using get for backward compatibility
-            node.properties = node_data.get("properties", {})
-            graph.add_node(node)
+        for edge_id, source, target in reader.edges():
+            if isinstance(source, str) or isinstance(target, str):
+                continue
+            source = ports[source[0]][source[1]]
+            target = ports[target[0]][target[1]]
+            if source and target:
+                edge = graph.add_edge(source, target)
+                if edge:
+                    edge.uuid = edge_id
 
-            for saved, port in zip(node_data.get("inputs", []), node.inputs):
-                port.id = saved["id"]
-                port_map[port.id] = port
+        meta = reader.meta
+        graph.revision = meta.get("revision")
+        Serializer._attach_functions(graph, path, meta.get("functions"), node_factory)
+        return graph, meta.get("comments", []), meta.get("viewport_pos", {"x": 0, "y": 0, "zoom": 1.0})
 
-            for saved, port in zip(node_data.get("outputs", []), node.outputs):
-                port.id = saved["id"]
-                port_map[port.id] = port
+    @staticmethod
+    def load_file(path, node_factory, progress=None) -> Graph:
+        # the format and the compression are picked from the first bytes, not the file name
+        compression, head = Compression.read_head(path, len(MAGIC))
+        if not BinaryFormat.is_binary(head):
+            try:
+                return Serializer.deserialize_file(path, node_factory, progress)
+            except Compression.ERRORS as e:
+                if compression == NONE:
+                    raise
+                raise ValueError(f"Corrupted {compression} graph file: {e}")
+        with open(path, "rb") as f:
+            raw = f.read()
+        if progress:
+            progress(len(raw), len(raw))
+        raw = Compression.decompress(raw)
+        return Serializer.deserialize_binary(raw, node_factory, path)
+
+    @staticmethod
+    @_gc_paused
+    def read_document(path) -> Dict[str, Any]:
+        # the whole json document of a graph file, whatever its format and compression
+        with open(path, "rb") as f:
+            raw = Compression.decompress(f.read())
+        return BinaryFormat.decode(raw) if BinaryFormat.is_binary(raw) else json.loads(raw)
+
+    @staticmethod
+    @_gc_paused
+    def from_data(data: Dict[str, Any], node_factory, path=None) -> Graph:
+        graph = Graph()
+        graph.revision = data.get("revision")
+        port_map = {}
+
+        for node_data in data["nodes"]:
+            Serializer._load_node(graph, port_map, node_data, node_factory)
 
         for edge_data in data["edges"]:
-            source = port_map.get(edge_data["source"])
-            target = port_map.get(edge_data["target"])
-            if source and target:
-                graph.add_edge(source, target)
+            Serializer._load_edge(graph, port_map, edge_data)
+        Serializer._attach_functions(graph, path, data.get("functions"), node_factory)
         return graph, data.get("comments", []), data.get("viewport_pos", {"x": 0, "y": 0, "zoom": 1.0})
 
+    @staticmethod
+    @_gc_paused
+    def deserialize_file(path, node_factory, progress=None) -> Graph:
+        # Same result as deserialize, but the file is parsed while the graph is built:
+        # every node/edge dict is dropped as soon as it is in the model instead of
+        # keeping the whole json document alive. progress(bytes_read, total_bytes)
+        graph = Graph()
+        port_map = {}
+        comments = []
+        viewport = {"x": 0, "y": 0, "zoom": 1.0}
+        early_edges = [] # only hand edited files have edges before nodes
+        functions = None
+
+        with open(path, "rb") as raw, Compression.open(raw, Serializer.compression_of(path)) as f:
+            stream = JsonStream(f, progress, raw)
+            nodes_loaded = False
+            for key in stream.members():
+                if key == "nodes":
+                    for node_data in stream.items():
+                        Serializer._load_node(graph, port_map, node_data, node_factory)
+                    nodes_loaded = True
+                elif key == "edges":
+                    for edge_data in stream.items():
+                        if nodes_loaded:
+                            Serializer._load_edge(graph, port_map, edge_data)
+                        else:
+                            early_edges.append(edge_data)
+                elif key == "comments":
+                    comments = stream.value()
+                elif key == "viewport_pos":
+                    viewport = stream.value()
+                elif key == "revision":
+                    graph.revision = stream.value()
+                elif key == "functions":
+                    functions = stream.value()
+                else:
+                    stream.value()
+
+        for edge_data in early_edges:
+            Serializer._load_edge(graph, port_map, edge_data)
+        Serializer._attach_functions(graph, path, functions, node_factory)
+        return graph, comments, viewport
+
+    @staticmethod
+    @_gc_paused
+    def add_to_graph(graph: Graph, data: Dict[str, Any], node_factory, port_map=None):
+        # adds the nodes and edges of a document to an existing graph and returns them,
+        # port_map can hold ports outside the document its edges connect to
+        port_map = dict(port_map or {})
+        nodes = []
+        for node_data in data["nodes"]:
+            nodes.append(Serializer._load_node(graph, port_map, node_data, node_factory))
+        edges = []
+        for edge_data in data["edges"]:
+            edge = Serializer._load_edge(graph, port_map, edge_data)
+            if edge:
+                edges.append(edge)
+        return nodes, edges
+
+    @staticmethod
+    def _attach_functions(graph: Graph, path, functions, node_factory):
+        if not functions:
+            return
+        if path is None:
+            Logger.LogWarning("Function bodies saved in their own files cannot be found without the graph path")
+            return
+        from core.function_store import FunctionStore
+        FunctionStore(graph, path, functions, node_factory)
+
+    @staticmethod
+    def _load_node(graph: Graph, port_map, node_data, node_factory):
+        node = Serializer.build_node(node_data, node_factory)
+        graph.add_node(node)
+        for port in node.inputs:
+            port_map[port.uuid] = port
+        for port in node.outputs:
+            port_map[port.uuid] = port
+        return node
+
+    @staticmethod
+    def _load_edge(graph: Graph, port_map, edge_data):
+        source = port_map.get(edge_data["source"])
+        target = port_map.get(edge_data["target"])
+        if source and target:
+            edge = graph.add_edge(source, target)
+            if edge:
+                edge.uuid = edge_data.get("id")
+            return edge
+        return None
+
+    @staticmethod
+    def node_data(node) -> Dict[str, Any]:
+        return {
+            "id": Serializer.uuid_of(node),
+            "type": node.node_type,
+            "title": node.title,
+            "x": node.x,
+            "y": node.y,
+            "z": node.z,
+            "properties": dict(node.properties), # the data must not change with the node (background saves)
+            "inputs": [
+                {"id": Serializer.uuid_of(p), "name": p.name, "type": p.port_type.value}
+                for p in node.inputs
+            ],
+            "outputs": [
+                {"id": Serializer.uuid_of(p), "name": p.name, "type": p.port_type.value}
+                for p in node.outputs
+            ],
+        }
+
+    @staticmethod
+    def build_node(node_data, node_factory) -> Node:
+        # the node of one node_data entry, not added to any graph yet
+        node = node_factory.create_node(
+            node_data["type"],
+            node_data["id"],
+            [saved["id"] for saved in node_data.get("inputs", ())],
+            [saved["id"] for saved in node_data.get("outputs", ())],
+        )
+        if node is None:
+            raise ValueError(
+                (f"Unknown node type: {node_data['type']}", node_data["type"])
+            )
+
+        node.title = node_data["title"]
+        node.x = node_data["x"]
+        node.y = node_data["y"]
+        node.z = node_data.get("z", 0) # using get for backward compatibility
+        node.properties = node_data.get("properties", {})
+        return node
+
     def serialize_node(self, node):
         return {
             "id": node.id,
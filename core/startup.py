@@ -0,0 +1,50 @@
+# startup.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import sys
+import time
+
+class StartupProfile:
+    # --startup-profile: time every start-up phase and print the breakdown once the
+    # main window is shown. Imported before anything else so the import phase is counted.
+    FLAG = "--startup-profile"
+    enabled = FLAG in sys.argv
+    phases = []
+    _start = time.perf_counter()
+    _last = _start
+
+    @staticmethod
+    def mark(phase: str):
+        if not StartupProfile.enabled:
+            return
+        now = time.perf_counter()
+        StartupProfile.phases.append((phase, now - StartupProfile._last))
+        StartupProfile._last = now
+
+    @staticmethod
+    def report():
+        if not StartupProfile.enabled:
+            return
+        total = StartupProfile._last - StartupProfile._start
+        width = max((len(phase) for phase, _ in StartupProfile.phases), default=0)
+        print("Startup profile:", file=sys.stderr)
+        for phase, seconds in StartupProfile.phases:
+            share = seconds / total * 100 if total else 0
+            print(f"  {phase:<{width}}  {seconds * 1000:8.1f} ms  {share:5.1f}%", file=sys.stderr)
+        print(f"  {'total':<{width}}  {total * 1000:8.1f} ms", file=sys.stderr)
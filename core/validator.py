@@ -22,6 +22,143 @@ from core.logger import Logger
 from core.port_types import PortDirection, PortType
 
 
+class TopologicalOrder:
+    # Pearce-Kelly dynamic topological order of the node DAG, kept up to date by Graph.
+    # Checking or inserting an edge only visits the nodes sitting between its two
+    # endpoints in the order. If the graph ever gets a cycle (ex: an old project file)
+    # the order is dropped and GraphValidator falls back to a plain DFS until it can
+    # be rebuilt.
+    def __init__(self, graph):
+        self.graph = graph
+        self.position = {}
+        self.valid = True
+        self._stale = False
+        self._next = 0
+
+    def add_node(self, node_id):
+        if node_id not in self.position:
+            self.position[node_id] = self._next
+            self._next += 1
+
+    def remove_node(self, node_id):
+        self.position.pop(node_id, None)
+
+    def add_edge(self, source_id, target_id):
+        if not self.valid:
+            return
+        position = self.position
+        if source_id not in position or target_id not in position:
+            self.valid = False
+            self._stale = True
+            return
+        if position[source_id] < position[target_id]:
+            return
+        if not self._reorder(source_id, target_id):
+            self.valid = False
+
+    def remove_edge(self, source_id, target_id):
+        # removing an edge never breaks a valid order, but it may remove the cycle
+        if not self.valid:
+            self._stale = True
+
+    def reaches(self, start_id, target_id):
+        # True / False, or None when the order can't answer
+        if not self.valid and not self.rebuild():
+            return None
+        position = self.position
+        upper = position.get(target_id)
+        lower = position.get(start_id)
+        if upper is None or lower is None:
+            return None
+        if start_id == target_id:
+            return True
+        if lower > upper:
+            return False
+        successors = self.graph.successors
+        visited = {start_id}
+        stack = [start_id]
+        while stack:
+            node_id = stack.pop()
+            for next_id in successors.get(node_id, ()):
+                if next_id == target_id:
+                    return True
+                if next_id not in visited and position.get(next_id, upper) < upper:
+                    visited.add(next_id)
+                    stack.append(next_id)
+        return False
+
+    def rebuild(self) -> bool:
+        if not self._stale:
+            return self.valid
+        self._stale = False
+        nodes = self.graph.nodes
+        successors = self.graph.successors
+        in_degree = dict.fromkeys(nodes, 0)
+        for node_id in nodes:
+            for next_id, count in successors.get(node_id, {}).items():
+                if next_id in in_degree:
+                    in_degree[next_id] += count
+
+        ready = [node_id for node_id, degree in in_degree.items() if degree == 0]
+        position = {}
+        while ready:
+            node_id = ready.pop()
+            position[node_id] = len(position)
+            for next_id, count in successors.get(node_id, {}).items():
+                if next_id in in_degree:
+                    in_degree[next_id] -= count
+                    if in_degree[next_id] == 0:
+                        ready.append(next_id)
+
+        self.valid = len(position) == len(nodes)
+        if self.valid:
+            self.position = position
+            self._next = len(position)
+            if Config.DEBUG:
+                Logger.LogMessage(f"VALIDATOR: topological order rebuilt ({len(position)} nodes)")
+        return self.valid
+
+    def _reorder(self, source_id, target_id) -> bool:
+        position = self.position
+        lower = position[target_id]
+        upper = position[source_id]
+
+        # nodes reachable from the target that currently sit before the source
+        forward = [target_id]
+        visited_forward = {target_id}
+        stack = [target_id]
+        successors = self.graph.successors
+        while stack:
+            node_id = stack.pop()
+            for next_id in successors.get(node_id, ()):
+                if next_id == source_id:
+                    return False
+                if next_id not in visited_forward and position[next_id] < upper:
+                    visited_forward.add(next_id)
+                    forward.append(next_id)
+                    stack.append(next_id)
+
+        # nodes reaching the source that currently sit after the target
+        backward = [source_id]
+        visited_backward = {source_id}
+        stack = [source_id]
+        predecessors = self.graph.predecessors
+        while stack:
+            node_id = stack.pop()
+            for prev_id in predecessors.get(node_id, ()):
+                if prev_id not in visited_backward and position[prev_id] > lower:
+                    visited_backward.add(prev_id)
+                    backward.append(prev_id)
+                    stack.append(prev_id)
+
+        backward.sort(key=position.__getitem__)
+        forward.sort(key=position.__getitem__)
+        slots = sorted(position[node_id] for node_id in backward + forward)
+        for node_id, slot in zip(backward + forward, slots):
+            position[node_id] = slot
+        return True
+
+
 class GraphValidator:
     @staticmethod
     def is_valid_connection(graph, a, b) -> bool:
@@ -58,7 +195,7 @@ class GraphValidator:
         source = source_item.port
         target = target_item.port
 
-        if GraphValidator._can_reach(graph, target.node, source.node):
+        if GraphValidator.creates_cycle(graph, source.node, target.node):
             if Config.DEBUG:
                 Logger.LogMessage("VALIDATOR: invalid -> cannot reach")
             return False
@@ -68,24 +205,31 @@ class GraphValidator:
         return True
 
     @staticmethod
-    def _can_reach(graph, start_node, target_node) -> bool:
-        visited = set()
+    def creates_cycle(graph, source_node, target_node) -> bool:
+        # an edge source -> target closes a cycle if target already reaches source
+        reached = graph.topological_order.reaches(target_node.id, source_node.id)
+        if reached is not None:
+            return reached
+        return GraphValidator._can_reach(graph, target_node, source_node)
 
-        def dfs(node):
-            if node.id in visited:
-                return False
-            visited.add(node.id)
-
-            if node is target_node:
-                return True
-
-            for edge in graph.edges.values():
-                if edge.source.node is node:
-                    if dfs(edge.target.node):
-                        return True
-            return False
-
-        return dfs(start_node)
+    @staticmethod
+    def _can_reach(graph, start_node, target_node) -> bool:
+        # iterative DFS on the graph adjacency index, only touches what start_node can reach
+        if start_node is target_node:
+            return True
+        target_id = target_node.id
+        successors = graph.successors
+        visited = {start_node.id}
+        stack = [start_node.id]
+        while stack:
+            node_id = stack.pop()
+            for next_id in successors.get(node_id, ()):
+                if next_id == target_id:
+                    return True
+                if next_id not in visited:
+                    visited.add(next_id)
+                    stack.append(next_id)
+        return False
 
     @staticmethod
     def is_valid_port_type(drag_edges, target_port) -> bool:
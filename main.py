@@ -18,8 +18,14 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import sys
+from core.startup import StartupProfile # first, so the import phase is measured from here
 IS_WINDOWS = sys.platform == "win32"
 
+if __name__ == "__main__" and sys.argv[1:2] in (["compile"], ["convert"]):
+    # headless commands, dispatched before anything below imports Qt
+    from cli import main as cli_main
+    sys.exit(cli_main(sys.argv[1:]))
+
 if not IS_WINDOWS:
     import pty
 
@@ -27,15 +33,21 @@ import os
 import sys
 import subprocess
 import time
+from pathlib import Path
+from uuid import uuid4
 from PySide6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, 
                                QWidget, QPushButton, QHBoxLayout, QTextEdit,
                                QSplitter, QFileDialog, QToolButton, QMenu, QDialog,
-                               QMessageBox)
+                               QMessageBox, QProgressDialog)
 from PySide6.QtCore import QPointF, QTimer, Qt, QRectF
 from PySide6.QtGui import QColor, QKeySequence, QIcon
 from core.graph import Graph
 from core.bash_emitter import BashEmitter
 from core.serializer import Serializer
+from core.script_cache import ScriptCache
+from core.journal import GraphJournal
+from core.project_saver import ProjectSaver
+from core.function_store import FunctionStore
 from nodes.flow_nodes import StartNode, IfNode, ForNode
 from nodes.command_nodes import RunCommandNode, EchoNode, ExitNode, PipeNode
 from nodes.variable_nodes import SetVariableNode, GetVariableNode, FileExistsNode
@@ -44,11 +56,8 @@ from nodes.utils_node import ToString
 from ui.comment_box import COMMENT_Z_BASE, CommentBoxItem
 from ui.graph_view import GraphView
 from ui.property_panel import PropertyPanel
-from ui.settings import SettingsDialog
 from ui.menu_style import apply_btn_style, apply_menu_style, apply_icon_for_btn
-from ui.about.about import AboutDialog
-from ui.keyboard_shortcuts import KeyboardShortcutsDialog
-from nodes.registry import NODE_REGISTRY
+from nodes.registry import NODE_REGISTRY, NodeFactory
 from core.highlights import BashHighlighter
 from core.ansi_to_html import ansi_to_html
 from core.config import Config, ConfigManager
@@ -57,16 +66,7 @@ from core.logger import Logger
 from core.traduction import Traduction
 from core.node_color import NodeColor
 from core.projects import ProjectManager
-from ui.welcome import WelcomeScreen
-from theme.theme_parser import load_theme, load_every_theme
-
-class NodeFactory:
-    @staticmethod
-    def create_node(node_type: str):
-        entry = NODE_REGISTRY.get(node_type)
-        return entry["class"]() if entry else None
-
-
+from theme.theme_parser import load_theme
 
 class VisualBashEditor(QMainWindow):
     def __init__(self):
@@ -77,8 +77,18 @@ class VisualBashEditor(QMainWindow):
             self.setMinimumSize(360, 294)
 
         self.graph = Graph()
+        self.bash_emitter = BashEmitter(self.graph, incremental=True)
+        self.script_cache = ScriptCache(self.graph)
         self.node_factory = NodeFactory()
         self.project_manager = ProjectManager()
+        self.journal = None # auto-save journal of the project graph, see core/journal.py
+        self._last_compaction = time.monotonic()
+        self._journal_timer = QTimer(self)
+        self._journal_timer.setSingleShot(True)
+        self._journal_timer.setInterval(GraphJournal.FLUSH_DELAY_MS)
+        self._journal_timer.timeout.connect(self.flush_journal)
+        self.saver = ProjectSaver(self)
+        self.saver.saved.connect(self._project_saved)
 
         self.setup_ui()
         self.create_initial_graph()
@@ -139,6 +149,11 @@ class VisualBashEditor(QMainWindow):
         self.keyboard.triggered.connect(self.open_keyboard_shortcuts)
         apply_icon_for_btn(self.keyboard, "keyboard")
 
+        self.emit_profile_action = self.more_menu.addAction(
+            Traduction.get_trad("emit_profile", "Generation Profile")
+        )
+        self.emit_profile_action.triggered.connect(self.open_emit_profile)
+
         self.full_screenfs = self.more_menu.addAction(
             Traduction.get_trad("full_screen", "Full Screen")
         )
@@ -231,18 +246,32 @@ class VisualBashEditor(QMainWindow):
     def generate_bash(self):
         if not self.graph.nodes:
             Debug.Warn(Traduction.get_trad("warn_generating_empty_graph", "Generating an empty graph."))
-        emitter = BashEmitter(self.graph)
-        bash_script = emitter.emit()
+        if self.bash_emitter.graph is not self.graph:
+            self.bash_emitter = BashEmitter(self.graph, incremental=True)
+        if self.script_cache.graph is not self.graph:
+            self.script_cache = ScriptCache(self.graph)
+        bash_script = None if Config.PROFILE_EMIT else self.script_cache.get()
+        if bash_script is None:
+            bash_script = self.bash_emitter.emit()
+            self.script_cache.put(bash_script)
         self.output_text.setPlainText(bash_script)
 
+    # dialogs are imported on first use, they are not needed to show the main window
+
     def open_settings(self):
+        from ui.settings import SettingsDialog
         dialog = SettingsDialog(self)
         dialog.traduction_changed.connect(self.graph_view.update_language)
         dialog.exec()
 
     def open_about(self):
+        from ui.about.about import AboutDialog
         AboutDialog(self).exec()
 
+    def open_emit_profile(self):
+        from ui.emit_profile import EmitProfileDialog
+        EmitProfileDialog(self.bash_emitter.last_profile, self).exec()
+
     def full_screen_action(self):
         if self.windowState() & Qt.WindowState.WindowFullScreen:
             self.setWindowState(Qt.WindowState.WindowNoState)
@@ -252,9 +281,11 @@ class VisualBashEditor(QMainWindow):
             apply_icon_for_btn(self.full_screenfs, "windowmode")
 
     def open_keyboard_shortcuts(self):
+        from ui.keyboard_shortcuts import KeyboardShortcutsDialog
         KeyboardShortcutsDialog(self).exec()
 
     def open_welcome_screen(self):
+        from ui.welcome import WelcomeScreen
         welcome = WelcomeScreen(self, self.project_manager)
         if welcome.exec() == QDialog.Accepted:
             self.load_current_project()
@@ -278,12 +309,26 @@ class VisualBashEditor(QMainWindow):
 
         file_path = self.project_manager.get_graph_path()
 
-        json_data = Serializer.serialize(self.graph, self.graph_view)
-
-        with open(file_path, 'w') as f:
-            f.write(json_data)
-
-        if msg:
+        # only the snapshot is taken here, encoding and writing happen on the saver thread
+        revision = str(uuid4())
+        if self.journal:
+            self.journal.checkpoint(revision)
+        self.graph.revision = revision
+        script = self.script_cache.to_save(self.project_manager.get_project_path())
+        data, bodies = FunctionStore.snapshot(
+            self.graph, file_path, self.graph_view, self.project_manager.get_split_functions()
+        )
+        binary = self.project_manager.graph_format() == "binary"
+        compression = self.project_manager.get_compression()
+        self.saver.save(data, file_path, binary, revision, msg, compression, bodies, script)
+        self._last_compaction = time.monotonic()
+
+    def _project_saved(self, path, revision, error, msg):
+        if self.journal and self.journal.graph_path == Path(path):
+            self.journal.saved(revision, not error)
+        if error:
+            Debug.Error(Traduction.get_trad("error_save_failed", f"Could not save the project: {error}", error=error))
+        elif msg:
             Debug.Log("Project saved.")
 
     def load_graph(self):
@@ -299,10 +344,7 @@ class VisualBashEditor(QMainWindow):
             Debug.Error(Traduction.get_trad("error_no_file_selected", "No file selected."))
             return
 
-        with open(file_path, "r") as f:
-            json_data = f.read()
-
-        self._load_graph_data(json_data)
+        self._load_graph_data(file_path)
 
         Debug.Log(
             Traduction.get_trad(
@@ -323,10 +365,7 @@ class VisualBashEditor(QMainWindow):
         if not graph_path.exists():
             return
 
-        with open(graph_path, "r") as f:
-            json_data = f.read()
-
-        self._load_graph_data(json_data)
+        self._load_graph_data(graph_path)
 
         if Config.DEBUG:
             Logger.LogMessage(
@@ -336,18 +375,51 @@ class VisualBashEditor(QMainWindow):
         if Config.SYNC_NODES_AND_GEN:
             self.generate_bash()
 
-    def _load_graph_data(self, json_data):
+    def _load_graph_data(self, graph_path):
+        self.saver.wait() # a save of this project could still be writing it
+        # only shows up when loading takes a while (big projects)
+        progress = QProgressDialog(Traduction.get_trad("loading_project", "Loading project..."), None, 0, 1000, self)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(500)
+
+        def report(done, total):
+            progress.setValue(done * 1000 // total if total else 0) # modal, so this also processes events
+
         try:
-            self.graph, comments, viewport = Serializer.deserialize(json_data, self.node_factory)
+            self.graph, comments, viewport = Serializer.load_file(graph_path, self.node_factory, report)
         except ValueError as e:
+            progress.close()
             msg_box = QMessageBox()
-            msg_box.setText(
-                f"Project contains unknown node type: '{e.args[0][1]}'\n"
-                "Please check if a newer version of this tool is available."
-            )
+            if e.args and isinstance(e.args[0], tuple):
+                msg_box.setText(
+                    f"Project contains unknown node type: '{e.args[0][1]}'\n"
+                    "Please check if a newer version of this tool is available."
+                )
+            else: # damaged file, e.g. a truncated compressed graph
+                msg_box.setText(f"Could not read the project graph:\n{e}")
             msg_box.setIcon(QMessageBox.Icon.Critical)
             msg_box.exec()
             raise
+        progress.close()
+
+        # a journal left behind means the last session ended before compacting it
+        self.journal = None
+        project_path = self.project_manager.get_project_path()
+        if project_path and Path(graph_path) == self.project_manager.get_graph_path():
+            recovered, journal_comments = GraphJournal.replay(self.graph, graph_path, self.node_factory)
+            if journal_comments is not None:
+                comments = journal_comments
+            if recovered:
+                Debug.Log(Traduction.get_trad(
+                    "journal_recovered",
+                    f"Recovered {recovered} unsaved change(s) from the auto-save journal.",
+                    count=recovered
+                ))
+            self.journal = GraphJournal(self.graph, graph_path, recovered)
+
+        self.script_cache = ScriptCache(self.graph)
+        if project_path:
+            self.script_cache.load(project_path)
 
         splitter = self.graph_view.parent()
         old_view = self.graph_view
@@ -383,6 +455,9 @@ class VisualBashEditor(QMainWindow):
 
         # Reset z counter based on loaded nodes to ensure new nodes are on top
         max_z = max((node.z for node in self.graph.nodes.values()), default=0)
+        if self.graph.function_store is not None:
+            max_z = max(max_z, self.graph.function_store.max_z())
+            self.graph.function_store.loaded_listeners.append(self._function_body_loaded)
         self.graph_view.graph_scene._z_counter = max_z + 1
 
         # Restore viewport after loading graph to ensure it's centered on the correct position
@@ -394,6 +469,15 @@ class VisualBashEditor(QMainWindow):
         self._connect_signals()
         splitter.setSizes([900, 300, 400])
 
+    def _function_body_loaded(self, function, nodes, edges):
+        # read on demand (scrolled into view, emitted...), shown like the rest of the graph
+        if self.journal:
+            self.journal.loaded(function, nodes, edges)
+        for node in nodes:
+            self.graph_view.add_node_item(node)
+        for edge in edges:
+            self.graph_view.graph_scene.add_core_edge(edge, self.graph_view.node_items)
+
     def _restore_viewport(self, viewport):
         center = QPointF(viewport.get("x", 0), viewport.get("y", 0))
         self.graph_view.set_zoom(viewport.get("zoom", 1.0))
@@ -418,14 +502,51 @@ class VisualBashEditor(QMainWindow):
         self.property_panel.clear()
 
     def auto_save(self):
-        if Config.AUTO_SAVE:
+        if not Config.AUTO_SAVE:
+            return
+        if self.journal is None:
             self.save_graph(msg=False)
+        elif not self._journal_timer.isActive():
+            self._journal_timer.start()
+
+    def _node_moved(self, node):
+        if self.journal:
+            self.journal.node_moved(node)
+        self.auto_save()
+
+    def _comments_changed(self):
+        if self.journal:
+            self.journal.comments_changed()
+        self.auto_save()
+
+    def flush_journal(self):
+        if not self.journal or not Config.AUTO_SAVE:
+            return
+        self.journal.flush(lambda: Serializer.comments_data(self.graph_view))
+        if not self.journal.records or self.saver.is_busy():
+            return
+        if (self.journal.records >= GraphJournal.COMPACT_RECORDS
+                or time.monotonic() - self._last_compaction >= GraphJournal.COMPACT_SECONDS):
+            self.save_graph(msg=False)
+
+    def closeEvent(self, event):
+        # compact on exit so the next session opens a plain graph file
+        if Config.AUTO_SAVE and self.journal:
+            self._journal_timer.stop()
+            self.journal.flush(lambda: Serializer.comments_data(self.graph_view))
+            if self.journal.records:
+                self.save_graph(msg=False)
+        # let a running save finish, then deliver its completion before the window goes
+        self.saver.wait()
+        QApplication.processEvents()
+        super().closeEvent(event)
 
     def _connect_signals(self):
         self.graph_view.graph_scene.graph_changed.connect(self.generate_bash)
         self.graph_view.graph_scene.graph_changed.connect(self.auto_save)
         self.graph_view.graph_scene.node_selected.connect(self.property_panel.set_node)
-        self.graph_view.graph_scene.auto_save_triggered.connect(self.auto_save)
+        self.graph_view.graph_scene.auto_save_triggered.connect(self._comments_changed)
+        self.graph_view.graph_scene.node_moved.connect(self._node_moved)
         self.graph_view.clear_property_panel_request.connect(self.clear_property_panel)
 
     def run_pty(self, script_path: str) -> str:
@@ -570,6 +691,7 @@ class VisualBashEditor(QMainWindow):
         self.settings_action.setText(Traduction.get_trad("settings", "Settings"))
         self.about_action.setText(Traduction.get_trad("about", "About"))
         self.keyboard.setText(Traduction.get_trad("keyboard_shortcuts", "Keyboard Shortcuts"))
+        self.emit_profile_action.setText(Traduction.get_trad("emit_profile", "Generation Profile"))
 
         apply_icon_for_btn(self.settings_action, "settings")
         apply_icon_for_btn(self.about_action, "about")
@@ -608,22 +730,31 @@ class VisualBashEditor(QMainWindow):
         super().keyPressEvent(event)
 
 def main():
+    StartupProfile.mark("imports")
     ConfigManager.load_config() # Load config before setting theme and language
+    StartupProfile.mark("config")
     NodeColor.set_node_colors()
     Traduction.set_translate_model(Config.lang)
+    StartupProfile.mark("node colors and translations")
 
-    app = QApplication(sys.argv)
+    app = QApplication([arg for arg in sys.argv if arg != StartupProfile.FLAG])
+    StartupProfile.mark("QApplication")
 
     load_theme(Config.theme)
     app.setOrganizationName("Lluciocc")
     app.setApplicationName("Vish")
     icon_path = Info.resource_path("assets/icons/Vish.svg")
     app.setWindowIcon(QIcon(icon_path))
+    StartupProfile.mark("theme and icon")
     editor = VisualBashEditor()
+    StartupProfile.mark("main window")
 
-    load_every_theme()
     Debug.init(editor)
     editor.show()
+    if StartupProfile.enabled:
+        app.processEvents() # count the first paint too
+        StartupProfile.mark("show and first paint")
+        StartupProfile.report()
 
     editor.open_welcome_screen()
 
@@ -18,12 +18,19 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 from abc import abstractmethod
+from types import GeneratorType
 from core.graph import Node, PortType
 from core.bash_context import BashContext
+from core.emit_cache import (OP_LINE, OP_FUNCTION_LINE, OP_INDENT, OP_DEDENT,
+                             OP_VARIABLE, OP_CHAIN, OP_BUFFER, OP_TEMP, OP_DISCARD)
 from core.node_color import NodeColor
 from core.debug import Debug
 
 class BaseNode(Node):
+    __slots__ = ("color",)
+    hoistable = False # the value can be computed once into a temp variable when used several times
+    hoist_inputs = True # False when inputs must be evaluated where they are written (ex: loop conditions)
+
     def __init__(self, node_type: str, title: str):
         super().__init__(node_type, title)
         color = NodeColor.get_color(node_type)
@@ -54,6 +61,47 @@ class BaseNode(Node):
     
     @staticmethod
     def emit_exec_chain(start_node, context, stop_at=None):
+        BaseNode._run(BaseNode._exec_chain(start_node, context, stop_at))
+
+    @staticmethod
+    def discard_chain(start_node, context, stop_at=None):
+        # For a chain that can never run: its nodes are still visited, so they count as
+        # emitted exactly like before, but nothing is written
+        context.discard(True)
+        yield ExecChain(start_node, context, stop_at)
+        context.discard(False)
+
+    @staticmethod
+    def emit_node(node, context):
+        # emit_bash of flow nodes is a generator asking for exec chains, drive it to its line
+        bash = node.emit_bash(context)
+        if isinstance(bash, GeneratorType):
+            bash = BaseNode._run(bash)
+        return bash
+
+    @staticmethod
+    def _run(generator):
+        # Work stack instead of recursion: a generator yields an ExecChain to get it emitted
+        # or another generator to delegate to, and is resumed with the result once it is done
+        stack = [generator]
+        value = None
+        while stack:
+            try:
+                request = stack[-1].send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                continue
+            value = None
+            if isinstance(request, ExecChain):
+                stack.append(BaseNode._exec_chain(request.start_node, request.context, request.stop_at))
+            else:
+                stack.append(request)
+        return value
+
+    @staticmethod
+    def _exec_chain(start_node, context, stop_at=None):
+        context.record_chain(start_node, stop_at)
         current = start_node
         while current:
             if current.id in context.emitted_nodes:
@@ -61,11 +109,49 @@ class BaseNode(Node):
 
             context.emitted_nodes.add(current.id)
 
-            bash = current.emit_bash(context)
-            if bash:
-                context.add_line(bash)
+            fragment = context.begin_node(current)
+            if fragment:
+                for op in fragment.ops:
+                    kind = op[0]
+                    if kind == OP_LINE:
+                        context.add_line(op[1])
+                    elif kind == OP_FUNCTION_LINE:
+                        context.add_function_line(op[1])
+                    elif kind == OP_INDENT:
+                        context.indent()
+                    elif kind == OP_DEDENT:
+                        context.dedent()
+                    elif kind == OP_VARIABLE:
+                        context.set_variable(op[1], op[2])
+                    elif kind == OP_BUFFER:
+                        context.set_buffer(op[1], op[2])
+                    elif kind == OP_TEMP:
+                        context.add_temp(op[1], op[2])
+                    elif kind == OP_DISCARD:
+                        context.discard(op[1])
+                    elif kind == OP_CHAIN:
+                        yield ExecChain(op[1], context, op[2])
+            else:
+                context.begin_statement(current)
+                bash = current.emit_bash(context)
+                if isinstance(bash, GeneratorType):
+                    bash = yield bash
+                if bash:
+                    context.add_line(bash)
+            context.end_node(current)
 
             if current == stop_at:
                 break
 
-            current = current.get_next_exec_node()
\ No newline at end of file
+            current = current.get_next_exec_node()
+
+        context.begin_statement()
+
+class ExecChain:
+    # Yielded by emit_bash to have the exec chain starting at start_node emitted at this point
+    __slots__ = ("start_node", "context", "stop_at")
+
+    def __init__(self, start_node, context, stop_at=None):
+        self.start_node = start_node
+        self.context = context
+        self.stop_at = stop_at
@@ -24,6 +24,8 @@ from nodes.registry import register_node
 
 @register_node("run_command", category="Commands", label="Run a command", description="Executes a shell command")
 class RunCommandNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("run_command", "Run Command")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -44,6 +46,8 @@ class RunCommandNode(BaseNode):
 
 @register_node("pipe", category="Commands", label="Pipe", description="Pipes output from Command 1 into Command 2")
 class PipeNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("pipe", "Pipe")
         self.add_input("Exec", PortType.EXEC, "Execution Input")
@@ -72,6 +76,8 @@ class PipeNode(BaseNode):
 
 @register_node("echo", category="Commands", label="Print a text", description="Prints a text to the console")
 class EchoNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("echo", "Echo")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -85,9 +91,7 @@ class EchoNode(BaseNode):
         text_port = self.inputs[1]
 
         if text_port.connected_edges:
-            source_node = text_port.connected_edges[0].source.node
-
-            value = source_node.emit_bash_value(context)
+            value = context.resolve_value(text_port.connected_edges[0].source)
             if value is not None:
                 text = value
 
@@ -99,6 +103,8 @@ class EchoNode(BaseNode):
 
 @register_node("exit", category="Commands", label="Exit script", description="Exits the script with a status code")
 class ExitNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("exit", "Exit")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
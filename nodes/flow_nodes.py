@@ -21,10 +21,12 @@ from core.port_types import PortType
 from core.bash_context import BashContext
 from nodes.registry import register_node
 from core.debug import Debug
-from nodes.base_node import BaseNode
+from nodes.base_node import BaseNode, ExecChain
 
 @register_node("start", category="Flow", label="Start", description="The starting point of the flow")
 class StartNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("start", "Start")
         self.add_output("Exec", PortType.EXEC, "Start of the flow")
@@ -34,6 +36,8 @@ class StartNode(BaseNode):
 
 @register_node("sequencer",category="Flow",label="Sequencer",description="Executes connected nodes sequentially from top to bottom")
 class SequencerNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("sequencer", "Sequencer")
 
@@ -59,12 +63,131 @@ class SequencerNode(BaseNode):
         for output in self.outputs:
             if output.connected_edges:
                 next_node = output.connected_edges[0].target.node
-                BaseNode.emit_exec_chain(next_node, context)
+                yield ExecChain(next_node, context)
 
         return ""
 
+class JobSlots:
+    # Bounded background jobs for the parallel flow nodes. Every job's pid is kept so
+    # its exit code can be read back once all of them are started, "wait -n" only
+    # blocks until a slot is free (bash keeps the status of jobs it already reaped).
+    DEFAULT_LIMIT = 4
+
+    @staticmethod
+    def parse_limit(value, default: int = DEFAULT_LIMIT) -> int:
+        # 0 or less means no limit
+        value = str(value).strip()
+        if not value:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            Debug.Warn(f"Invalid job count '{value}', using {default}.")
+            return default
+
+    @staticmethod
+    def begin(context: BashContext, limit: int):
+        context.add_temp("_vish_pids", "()")
+        context.add_temp("_vish_codes", "()")
+        if limit > 0:
+            context.add_temp("_vish_running", "0")
+
+    @staticmethod
+    def launch(context: BashContext, limit: int, key=None):
+        # right after the "&" of the job, key defaults to the next free index
+        if key is None:
+            context.add_line("_vish_pids+=($!)")
+        else:
+            context.add_line(f"_vish_pids[{key}]=$!")
+        if limit > 0:
+            context.add_line(f"if (( ++_vish_running >= {limit} )); then")
+            context.indent()
+            context.add_line("wait -n")
+            context.add_line("(( _vish_running-- ))")
+            context.dedent()
+            context.add_line("fi")
+
+    @staticmethod
+    def collect(context: BashContext, label: str, fail: bool = True):
+        context.add_temp("_vish_failed", "0")
+        context.add_line('for _vish_job in "${!_vish_pids[@]}"; do')
+        context.indent()
+        context.add_line('wait "${_vish_pids[$_vish_job]}"')
+        context.add_line("_vish_codes[$_vish_job]=$?")
+        context.add_line("if (( _vish_codes[$_vish_job] != 0 )); then")
+        context.indent()
+        context.add_line(f'echo "{label} $_vish_job failed with exit code ${{_vish_codes[$_vish_job]}}" >&2')
+        context.add_line("_vish_failed=1")
+        context.dedent()
+        context.add_line("fi")
+        context.dedent()
+        context.add_line("done")
+        if fail:
+            context.add_line("if (( _vish_failed )); then")
+            context.indent()
+            context.add_line("exit 1")
+            context.dedent()
+            context.add_line("fi")
+
+@register_node("parallel_sequencer", category="Flow", label="Parallel Sequencer", description="Runs connected steps as concurrent background jobs")
+class ParallelSequencerNode(BaseNode):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("parallel_sequencer", "Parallel Sequencer")
+
+        self.add_input("Exec", PortType.EXEC, "Control flow input")
+
+        # Next comes first so the steps can be added and removed at the end like the Sequencer
+        self.add_output("Next", PortType.EXEC, "Continue once every step is done")
+        self.add_output("Step 1", PortType.EXEC, "First parallel step")
+        self.add_output("Step 2", PortType.EXEC, "Second parallel step")
+        self.add_output("Step 3", PortType.EXEC, "Third parallel step")
+
+        self.properties["max_jobs"] = str(JobSlots.DEFAULT_LIMIT)
+        self.properties["DYNAMIC_add_output_dynamic"] = ""
+        self.properties["DYNAMIC_remove_output_dynamic"] = ""
+
+    def add_output_dynamic(self):
+        self.add_output(f"Step {len(self.outputs)}", PortType.EXEC, "")
+
+    def remove_output_dynamic(self):
+        if len(self.outputs) <= 4:
+            Debug.Error('Cannot have less than 3 steps')
+        else:
+            self.outputs.pop(-1)
+
+    def emit_bash(self, context: BashContext) -> str:
+        steps = [
+            (index, output.connected_edges[0].target.node)
+            for index, output in enumerate(self.outputs[1:], 1)
+            if output.connected_edges
+        ]
+        if steps:
+            limit = JobSlots.parse_limit(self.properties.get("max_jobs", JobSlots.DEFAULT_LIMIT))
+            JobSlots.begin(context, limit)
+            for index, step_node in steps:
+                context.add_line("(")
+                context.indent()
+                yield ExecChain(step_node, context)
+                context.dedent()
+                context.add_line(") &")
+                JobSlots.launch(context, limit, index)
+            JobSlots.collect(context, "Parallel step")
+
+        next_port = self.outputs[0]
+        if next_port.connected_edges:
+            yield ExecChain(next_port.connected_edges[0].target.node, context)
+
+        return ""
+
+    def get_next_exec_node(self):
+        return None
+
 @register_node("if", category="Flow", label="If Condition", description="Evaluates a condition and branches the flow")
 class IfNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("if", "If")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -79,31 +202,49 @@ class IfNode(BaseNode):
             Debug.Warn("If Node: No condition connected, skipping if statement.")
             return ""
 
+        if context.optimize and cond in ("true", "false"):
+            # condition known at generation time, only keep the branch that runs
+            taken = 0 if cond == "true" else 1
+            if not self.outputs[taken].connected_edges:
+                context.add_line(":") # keeps the enclosing block from becoming empty
+            for output_index in (0, 1):
+                port = self.outputs[output_index]
+                if not port.connected_edges:
+                    continue
+                if output_index == taken:
+                    yield ExecChain(port.connected_edges[0].target.node, context)
+                else:
+                    yield from BaseNode.discard_chain(port.connected_edges[0].target.node, context)
+        else:
+            yield from self._emit_if(context, cond)
+
+        next_port = self.outputs[2]
+        if next_port.connected_edges:
+            yield ExecChain(
+                next_port.connected_edges[0].target.node,
+                context
+            )
+
+        return ""
+
+    def _emit_if(self, context: BashContext, cond: str):
         context.add_line(f"if {cond}; then")
         context.indent()
-        self._emit_branch(context, 0)
+        yield from self._emit_branch(context, 0)
         context.dedent()
         if self.outputs[1].connected_edges:
             context.add_line("else")
             context.indent()
-            self._emit_branch(context, 1)
+            yield from self._emit_branch(context, 1)
             context.dedent()
 
         context.add_line("fi")
-        next_port = self.outputs[2]
-        if next_port.connected_edges:
-            BaseNode.emit_exec_chain(
-                next_port.connected_edges[0].target.node,
-                context
-            )
-
-        return ""
 
     def _emit_branch(self, context: BashContext, output_index: int):
         port = self.outputs[output_index]
         if not port.connected_edges:
             return
-        BaseNode.emit_exec_chain(
+        yield ExecChain(
             port.connected_edges[0].target.node,
             context
         )
@@ -111,6 +252,8 @@ class IfNode(BaseNode):
 
 @register_node("for", category="Flow", label="For Loop", description="Iterates over a list")
 class ForNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("for", "For Loop")
 
@@ -122,6 +265,7 @@ class ForNode(BaseNode):
         self.add_output("Next", PortType.EXEC, "Continue after loop")
 
         self.properties["variable"] = "item"
+        self.properties["parallel"] = "0"
 
     def emit_bash(self, context: BashContext) -> str:
         var_name = self.properties.get("variable", "item")
@@ -132,25 +276,45 @@ class ForNode(BaseNode):
             source_node = list_port.connected_edges[0].source.node
             list_expr = source_node.properties.get("value", list_expr)
 
-        context.add_line(f"for {var_name} in {list_expr}; do")
-        context.indent()
-
         body_port = self.outputs[0]
-        if body_port.connected_edges:
-            start_node = body_port.connected_edges[0].target.node
-            BaseNode.emit_exec_chain(start_node, context)
+        workers = JobSlots.parse_limit(self.properties.get("parallel", "0"), 0)
+        if workers > 0 and body_port.connected_edges:
+            # each iteration runs in its own subshell which gets a copy of the item
+            # variable as it was when the job started
+            JobSlots.begin(context, workers)
+            context.add_line(f"for {var_name} in {list_expr}; do")
+            context.indent()
+            context.add_line("(")
+            context.indent()
+            yield ExecChain(body_port.connected_edges[0].target.node, context)
+            context.dedent()
+            context.add_line(") &")
+            JobSlots.launch(context, workers)
+            context.dedent()
+            context.add_line("done")
+            JobSlots.collect(context, "Loop iteration", fail=False)
+        else:
+            context.add_line(f"for {var_name} in {list_expr}; do")
+            context.indent()
 
-        context.dedent()
-        context.add_line("done")
+            if body_port.connected_edges:
+                start_node = body_port.connected_edges[0].target.node
+                yield ExecChain(start_node, context)
+
+            context.dedent()
+            context.add_line("done")
 
         next_port = self.outputs[2]
         if next_port.connected_edges:
             start_node = next_port.connected_edges[0].target.node
-            BaseNode.emit_exec_chain(start_node, context)
+            yield ExecChain(start_node, context)
         return ""
     
 @register_node("while", category="Flow", label="While Loop", description="Repeats execution while a condition is true")
 class WhileNode(BaseNode):
+    __slots__ = ()
+    hoist_inputs = False
+
     def __init__(self):
         super().__init__("while", "While")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -164,23 +328,29 @@ class WhileNode(BaseNode):
             Debug.Warn("While Node: No condition connected, skipping while loop.")
             return ""
 
-        context.add_line(f"while {cond}; do")
-        context.indent()
-
         body_port = self.outputs[0]
-        if body_port.connected_edges:
-            BaseNode.emit_exec_chain(
-                body_port.connected_edges[0].target.node,
-                context,
-                stop_at=self
-            )
+        if context.optimize and cond == "false":
+            # the body can never run
+            context.add_line(":")
+            if body_port.connected_edges:
+                yield from BaseNode.discard_chain(body_port.connected_edges[0].target.node, context, stop_at=self)
+        else:
+            context.add_line(f"while {cond}; do")
+            context.indent()
 
-        context.dedent()
-        context.add_line("done")
+            if body_port.connected_edges:
+                yield ExecChain(
+                    body_port.connected_edges[0].target.node,
+                    context,
+                    stop_at=self
+                )
+
+            context.dedent()
+            context.add_line("done")
 
         next_port = self.outputs[1]
         if next_port.connected_edges:
-            BaseNode.emit_exec_chain(
+            yield ExecChain(
                 next_port.connected_edges[0].target.node,
                 context
             )
@@ -192,6 +362,8 @@ class WhileNode(BaseNode):
     
 @register_node("function", category="Flow", label="Function", description="Defines a bash function")
 class FunctionNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("function", "Function")
         self.add_output("Exec", PortType.EXEC, "Function body")
@@ -204,15 +376,13 @@ class FunctionNode(BaseNode):
 
         prev_buffer = context._current_buffer
         prev_indent = context.indent_level
-        context._current_buffer = "function"
-        context.indent_level = 1
+        context.set_buffer("function", 1)
 
         body_port = self.outputs[0]
         if body_port.connected_edges:
             start_node = body_port.connected_edges[0].target.node
-            BaseNode.emit_exec_chain(start_node, context)
-        context.indent_level = prev_indent
-        context._current_buffer = prev_buffer
+            yield ExecChain(start_node, context)
+        context.set_buffer(prev_buffer, prev_indent)
 
         context.add_function_line("}")
         context.add_function_line("")
@@ -222,6 +392,8 @@ class FunctionNode(BaseNode):
     
 @register_node("call",category="Flow",label="Call Function",description="Calls a bash function")
 class CallNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("call", "Call")
 
@@ -235,6 +407,8 @@ class CallNode(BaseNode):
     
 @register_node("return", category="Flow", label="Return", description="Return the result of a fonction")
 class ReturnNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("return", "Return")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
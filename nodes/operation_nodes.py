@@ -17,19 +17,106 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import re
 from nodes.base_node import BaseNode
 from core.port_types import PortType
 from core.bash_context import BashContext
 from nodes.registry import register_node
 
+_INT_LITERAL = re.compile(r"-?(0|[1-9][0-9]*)")
+_INT_MIN = -(1 << 63)
+
 class MathNode(BaseNode):
+    __slots__ = ()
+
     def _resolve(self, port, context: BashContext, default="0"):
         if port.connected_edges:
-            return port.connected_edges[0].source.node.emit_bash_value(context)
+            return context.resolve_value(port.connected_edges[0].source)
         return default
 
+    def _operand(self, port, context: BashContext):
+        # text of the input inside $(( )) and its value when it is known at generation time
+        if not port.connected_edges:
+            return "0", 0
+        source = port.connected_edges[0].source
+        value = context.resolve_value(source)
+        constant = MathNode.constant(value)
+        if constant is not None:
+            return (f"({constant})" if constant < 0 else str(constant)), constant
+        inner = context.arithmetic.get(source.id)
+        if isinstance(inner, str) and value == f"$(({inner}))": # not hoisted, fuse it
+            return f"({inner})", None
+        return f"{value}", None
+
+    def _arithmetic(self, context: BashContext, operator: str) -> str:
+        if not context.optimize:
+            a = self._resolve(self.inputs[0], context)
+            b = self._resolve(self.inputs[1], context)
+            return f"$(({a} {operator} {b}))"
+
+        a, a_value = self._operand(self.inputs[0], context)
+        b, b_value = self._operand(self.inputs[1], context)
+        if a_value is not None and b_value is not None:
+            folded = MathNode.fold(operator, a_value, b_value)
+            if folded is not None:
+                context.arithmetic[self.outputs[0].id] = folded
+                return str(folded)
+        inner = f"{a} {operator} {b}"
+        context.arithmetic[self.outputs[0].id] = inner
+        return f"$(({inner}))"
+
+    def _comparison(self, context: BashContext, operator: str) -> str:
+        if not context.optimize:
+            a = self._resolve(self.inputs[0], context)
+            b = self._resolve(self.inputs[1], context)
+            return f"(( {a} {operator} {b} ))"
+
+        a, a_value = self._operand(self.inputs[0], context)
+        b, b_value = self._operand(self.inputs[1], context)
+        if a_value is not None and b_value is not None:
+            # still a single command, so it can replace the test anywhere in a condition
+            return "true" if MathNode.compare(operator, a_value, b_value) else "false"
+        return f"(( {a} {operator} {b} ))"
+
+    @staticmethod
+    def constant(value):
+        if isinstance(value, str) and _INT_LITERAL.fullmatch(value):
+            number = int(value)
+            if _INT_MIN <= number < -_INT_MIN:
+                return number
+        return None
+
+    @staticmethod
+    def fold(operator: str, a: int, b: int):
+        # same result as bash: 64 bit wrap around, division truncates towards zero.
+        # None when bash would fail at runtime, the error is kept in the script
+        if operator in ("/", "%"):
+            if b == 0 or (a == _INT_MIN and b == -1):
+                return None
+            quotient = abs(a) // abs(b)
+            if (a < 0) != (b < 0):
+                quotient = -quotient
+            result = quotient if operator == "/" else a - b * quotient
+        elif operator == "+":
+            result = a + b
+        elif operator == "-":
+            result = a - b
+        else:
+            result = a * b
+        return (result - _INT_MIN) % (1 << 64) + _INT_MIN
+
+    @staticmethod
+    def compare(operator: str, a: int, b: int) -> bool:
+        if operator == "<":
+            return a < b
+        if operator == ">":
+            return a > b
+        return a == b
+
 @register_node("number_constant", category="Constants", label="Number Constant", description="Represents a number constant value")
 class NumberConstant(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("number_constant", "Number Constant")
         self.add_output("Value", PortType.INT, "Integer value")
@@ -40,6 +127,9 @@ class NumberConstant(MathNode):
 
 @register_node("addition", category="Math", label="Addition")
 class Addition(MathNode):
+    __slots__ = ()
+    hoistable = True
+
     def __init__(self):
         super().__init__("addition", "Addition")
         self.add_input("A", PortType.INT, "Summand")
@@ -47,12 +137,13 @@ class Addition(MathNode):
         self.add_output("Result", PortType.INT, "Sum")
 
     def emit_bash_value(self, context: BashContext) -> str:
-        a = self._resolve(self.inputs[0], context)
-        b = self._resolve(self.inputs[1], context)
-        return f"$(({a} + {b}))"
+        return self._arithmetic(context, "+")
 
 @register_node("subtraction", category="Math", label="Subtraction")
 class Subtraction(MathNode):
+    __slots__ = ()
+    hoistable = True
+
     def __init__(self):
         super().__init__("subtraction", "Subtraction")
         self.add_input("A", PortType.INT, "Minuend")
@@ -60,12 +151,13 @@ class Subtraction(MathNode):
         self.add_output("Result", PortType.INT, "Difference")
 
     def emit_bash_value(self, context: BashContext) -> str:
-        a = self._resolve(self.inputs[0], context)
-        b = self._resolve(self.inputs[1], context)
-        return f"$(({a} - {b}))"
+        return self._arithmetic(context, "-")
 
 @register_node("multiplication", category="Math", label="Multiplication")
 class Multiplication(MathNode):
+    __slots__ = ()
+    hoistable = True
+
     def __init__(self):
         super().__init__("multiplication", "Multiplication")
         self.add_input("A", PortType.INT, "Multiplier")
@@ -73,12 +165,13 @@ class Multiplication(MathNode):
         self.add_output("Result", PortType.INT, "Product")
 
     def emit_bash_value(self, context: BashContext) -> str:
-        a = self._resolve(self.inputs[0], context)
-        b = self._resolve(self.inputs[1], context)
-        return f"$(({a} * {b}))"
+        return self._arithmetic(context, "*")
 
 @register_node("division", category="Math", label="Division")
 class Division(MathNode):
+    __slots__ = ()
+    hoistable = True
+
     def __init__(self):
         super().__init__("division", "Division")
         self.add_input("A", PortType.INT, "Numerator")
@@ -86,12 +179,13 @@ class Division(MathNode):
         self.add_output("Result", PortType.INT, "Fraction")
 
     def emit_bash_value(self, context: BashContext) -> str:
-        a = self._resolve(self.inputs[0], context)
-        b = self._resolve(self.inputs[1], context)
-        return f"$(({a} / {b}))"
+        return self._arithmetic(context, "/")
 
 @register_node("modulo", category="Math", label="Modulo", description="Calculates the remainder of the division")
 class Modulo(MathNode):
+    __slots__ = ()
+    hoistable = True
+
     def __init__(self):
         super().__init__("modulo", "Modulo")
         self.add_input("A", PortType.INT, "Dividend")
@@ -99,12 +193,12 @@ class Modulo(MathNode):
         self.add_output("Result", PortType.INT, "Remainder")
 
     def emit_bash_value(self, context: BashContext) -> str:
-        a = self._resolve(self.inputs[0], context)
-        b = self._resolve(self.inputs[1], context)
-        return f"$(({a} % {b}))"
+        return self._arithmetic(context, "%")
 
 @register_node("less_than", category="Logic", label="Less Than", description="Is A less than B?")
 class LessThan(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("less_than", "Less Than")
         self.add_input("A", PortType.INT, "A")
@@ -112,12 +206,12 @@ class LessThan(MathNode):
         self.add_output("Result", PortType.CONDITION, "Result")
 
     def emit_condition(self, context: BashContext) -> str:
-        a = self._resolve(self.inputs[0], context)
-        b = self._resolve(self.inputs[1], context)
-        return f"(( {a} < {b} ))"
+        return self._comparison(context, "<")
 
 @register_node("greater_than", category="Logic", label="Greater Than", description="Is A greater than B?")
 class GreaterThan(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("greater_than", "Greater Than")
         self.add_input("A", PortType.INT, "A")
@@ -125,12 +219,12 @@ class GreaterThan(MathNode):
         self.add_output("Result", PortType.CONDITION, "Result")
 
     def emit_condition(self, context: BashContext) -> str:
-        a = self._resolve(self.inputs[0], context)
-        b = self._resolve(self.inputs[1], context)
-        return f"(( {a} > {b} ))"
+        return self._comparison(context, ">")
 
 @register_node("equals", category="Logic", label="Equals (numeric)")
 class EqualsNumeric(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("equals", "Equals (Numeric)")
         self.add_input("A", PortType.INT, "A")
@@ -138,12 +232,12 @@ class EqualsNumeric(MathNode):
         self.add_output("Result", PortType.CONDITION, "Result")
 
     def emit_condition(self, context: BashContext) -> str:
-        a = self._resolve(self.inputs[0], context)
-        b = self._resolve(self.inputs[1], context)
-        return f"(( {a} == {b} ))"
+        return self._comparison(context, "==")
 
 @register_node("equals_string", category="Logic", label="Equals (string)")
 class EqualsString(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("equals_string", "Equals (String)")
         self.add_input("A", PortType.STRING, "A")
@@ -157,6 +251,8 @@ class EqualsString(MathNode):
 
 @register_node("equals_variable", category="Logic", label="Equals (variable)")
 class EqualsVariable(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("equals_variable", "Equals (Variable)")
         self.add_input("A", PortType.VARIABLE, "A")
@@ -170,6 +266,8 @@ class EqualsVariable(MathNode):
 
 @register_node("logical_and", category="Logic", label="AND")
 class LogicalAnd(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("logical_and", "AND")
         self.add_input("A", PortType.CONDITION, "A")
@@ -187,6 +285,8 @@ class LogicalAnd(MathNode):
 
 @register_node("logical_or", category="Logic", label="OR")
 class LogicalOr(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("logical_or", "OR")
         self.add_input("A", PortType.CONDITION, "A")
@@ -204,6 +304,8 @@ class LogicalOr(MathNode):
 
 @register_node("logical_not", category="Logic", label="NOT")
 class LogicalNot(MathNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("logical_not", "NOT")
         self.add_input("A", PortType.CONDITION, "A")
@@ -217,6 +319,8 @@ class LogicalNot(MathNode):
 
 @register_node("command_condition", category="Logic", label="Command Condition", description="Uses a custom command as a condition")
 class CommandConditionNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("command_condition", "Command Condition")
         self.add_output("command", PortType.CONDITION, "Command")
@@ -30,8 +30,31 @@ def register_node(node_type: str, *, label=None, category="Other", description="
         return cls
     return decorator
 
-def create_node(node_type):
+def _assign_ids(node, uuid, input_ids, output_ids):
+    # ids of a saved node given up front, ports past the saved ones keep theirs unset
+    node.uuid = uuid
+    if input_ids:
+        for port, port_id in zip(node.inputs, input_ids):
+            port.uuid = port_id
+    if output_ids:
+        for port, port_id in zip(node.outputs, output_ids):
+            port.uuid = port_id
+    return node
+
+def create_node(node_type, uuid=None, input_ids=None, output_ids=None):
     entry = NODE_REGISTRY.get(node_type)
     if not entry:
         raise ValueError(f"Unknown node type: {node_type}")
-    return entry["class"]()
+    node = entry["class"]()
+    return node if uuid is None else _assign_ids(node, uuid, input_ids, output_ids)
+
+class NodeFactory:
+    # Nodes never generate uuids themselves (see core/graph.py): a new node gets one
+    # the first time it is saved, a loaded node gets the saved ones passed here.
+    @staticmethod
+    def create_node(node_type: str, uuid=None, input_ids=None, output_ids=None):
+        entry = NODE_REGISTRY.get(node_type)
+        if not entry:
+            return None
+        node = entry["class"]()
+        return node if uuid is None else _assign_ids(node, uuid, input_ids, output_ids)
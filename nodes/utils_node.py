@@ -24,6 +24,8 @@ from nodes.registry import register_node
 
 @register_node("to_string", category="Conversion", label="To String")
 class ToString(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("to_string", "To String")
         self.add_input("Input", PortType.INT, "Value to convert to string")
@@ -33,7 +35,7 @@ class ToString(BaseNode):
         input_port = self.inputs[0]
 
         if input_port.connected_edges:
-            expr = input_port.connected_edges[0].source.node.emit_bash(context)
+            expr = BaseNode.emit_node(input_port.connected_edges[0].source.node, context)
         else:
             expr = input_port.value or ""
 
@@ -41,6 +43,8 @@ class ToString(BaseNode):
 
 @register_node("to_int", category="Conversion", label="To Int")
 class ToInt(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("to_int", "To Int")
         self.add_input("Input", PortType.VARIABLE, "Value to convert to integer")
@@ -50,7 +54,7 @@ class ToInt(BaseNode):
         input_port = self.inputs[0]
 
         if input_port.connected_edges:
-            expr = input_port.connected_edges[0].source.node.emit_bash(context)
+            expr = BaseNode.emit_node(input_port.connected_edges[0].source.node, context)
         else:
             expr = input_port.value or "0"
 
@@ -58,6 +62,8 @@ class ToInt(BaseNode):
 
 @register_node("sleep", category="Utilities", label="Sleep", description="Pauses execution for a specified duration")
 class SleepNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("sleep", "Sleep")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -77,6 +83,8 @@ class SleepNode(BaseNode):
     
 @register_node("download_file", category="Utilities", label="Download File", description="Downloads a file from a specified URL")
 class DownloadFileNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("download_file", "Download File")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -92,6 +100,8 @@ class DownloadFileNode(BaseNode):
 
 @register_node("git_clone", category="Utilities", label="Git Clone", description="Clones a Git repository to a specified destination")
 class GitCloneNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("git_clone", "Git Clone")
         self.add_input("Exec", PortType.EXEC, "Control flow input")        
@@ -109,6 +119,8 @@ class GitCloneNode(BaseNode):
 
 @register_node("open_website", category="Utilities", label="Open Website", description="Opens a specified URL in the default web browser")  
 class OpenWebsiteNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("open_website", "Open Website")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
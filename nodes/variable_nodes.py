@@ -24,6 +24,8 @@ from .base_node import BaseNode
 
 @register_node("set_variable", category="Variables", label="Set Variable", description="Sets a variable to a specific value")
 class SetVariableNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("set_variable", "Set Variable")
         self.add_input("Exec", PortType.EXEC, "Control flow input")
@@ -45,17 +47,17 @@ class SetVariableNode(BaseNode):
 
         value_port = self.inputs[1]
         if value_port.connected_edges:
-            source_node = value_port.connected_edges[0].source.node
-
-            emitted = source_node.emit_bash_value(context)
+            emitted = context.resolve_value(value_port.connected_edges[0].source)
             if emitted is not None:
                 value_expr = emitted
 
-        context.variables[var_name] = value_expr
+        context.set_variable(var_name, value_expr)
         return f'{var_name}={value_expr}'
 
 @register_node("get_variable", category="Variables", label="Get Variable", description="Gets the value of a variable")
 class GetVariableNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("get_variable", "Get Variable")
         self.add_output("Value", PortType.VARIABLE, "Variable value")
@@ -70,6 +72,8 @@ class GetVariableNode(BaseNode):
 
 @register_node("file_exists", category="Variables", label="File Exists", description="Checks if a file exists")
 class FileExistsNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("file_exists", "File Exists")
         self.add_input("Path", PortType.PATH, "File path")
@@ -88,6 +92,8 @@ class FileExistsNode(BaseNode):
     
 @register_node("string_constant", category="Constants", label="String Constant", description="Represents a string constant value")
 class StringConstantNode(BaseNode):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__("string_constant", "String Constant")
         self.add_output("Value", PortType.STRING, "String value")
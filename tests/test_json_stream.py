@@ -0,0 +1,86 @@
+# test_json_stream.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+import io
+import json
+import random
+import unittest
+from core.json_stream import JsonStream
+
+def random_value(rng: random.Random, depth=0):
+    kind = rng.randrange(9 if depth < 4 else 6)
+    if kind == 0:
+        return rng.randint(-10 ** 6, 10 ** 6)
+    if kind == 1:
+        return rng.uniform(-1e6, 1e6)
+    if kind == 2:
+        return rng.choice((1e-7, -2.5e21, 0.5, -0.0, 1e300))
+    if kind == 3:
+        return "".join(rng.choice("ab \"\\/é€\n𝄞") for _ in range(rng.randrange(6)))
+    if kind == 4:
+        return rng.choice((True, False))
+    if kind == 5:
+        return None
+    if kind in (6, 7):
+        return {f"k{i}": random_value(rng, depth + 1) for i in range(rng.randrange(4))}
+    return [random_value(rng, depth + 1) for _ in range(rng.randrange(4))]
+
+def read(stream: JsonStream):
+    # the whole document through members() and items(), like Serializer reads a graph
+    kind = stream._peek()
+    if kind == "{":
+        return {key: read(stream) for key in stream.members()}
+    if kind == "[":
+        return list(stream.items())
+    return stream.value()
+
+class JsonStreamTest(unittest.TestCase):
+    def setUp(self):
+        self._chunk_size = JsonStream.CHUNK_SIZE
+
+    def tearDown(self):
+        JsonStream.CHUNK_SIZE = self._chunk_size
+
+    def parse(self, text: str):
+        return read(JsonStream(io.BytesIO(text.encode("utf-8"))))
+
+    def test_random_documents_match_json_loads(self):
+        rng = random.Random(1234)
+        for chunk_size in (1, 2, 3, 5, 7, 16):
+            JsonStream.CHUNK_SIZE = chunk_size
+            for _ in range(200):
+                document = {f"key{i}": random_value(rng) for i in range(rng.randrange(1, 5))}
+                for text in (json.dumps(document), json.dumps(document, indent=2)):
+                    self.assertEqual(self.parse(text), json.loads(text), (chunk_size, text))
+                items = json.dumps(list(document.values()))
+                self.assertEqual(self.parse(items), json.loads(items), (chunk_size, items))
+
+    def test_number_split_after_dot_exponent_or_sign(self):
+        for chunk_size in range(1, 8):
+            JsonStream.CHUNK_SIZE = chunk_size
+            for text in ("[1.5, 2]", "[12e-3, -4]", "[1E+10,-0.25]", '{"a": -7.125e2, "b": 3}'):
+                self.assertEqual(self.parse(text), json.loads(text), (chunk_size, text))
+
+    def test_trailing_commas_are_rejected(self):
+        for text in ('{"a": 1,}', "[1,]", "{,}", "[,]"):
+            with self.assertRaises(ValueError, msg=text):
+                self.parse(text)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -27,6 +27,7 @@ import shutil
 
 BUILTIN_THEMES = ["dark", "white", "purple"]
 theme_list: list[str] = list(BUILTIN_THEMES)
+_themes_scanned = False
 
 def parse_yaml(text: str) -> dict:
     lines = text.splitlines()
@@ -177,6 +178,13 @@ def load_theme(filepath: str) -> type:
     return Theme
 
 def load_every_theme() -> None:
+    # the themes folder is only scanned once, import_theme and delete_theme keep
+    # theme_list up to date afterwards
+    global _themes_scanned
+    if _themes_scanned:
+        return
+    _themes_scanned = True
+
     config_dir = _themes_dir()
     if not config_dir.exists():
         return
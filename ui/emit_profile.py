@@ -0,0 +1,91 @@
+# emit_profile.py
+#
+# Copyright 2026 Lluciocc
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
+    QHeaderView, QAbstractItemView,
+)
+from PySide6.QtCore import Qt
+from core.traduction import Traduction
+from theme.theme import Theme
+
+class EmitProfileDialog(QDialog):
+    # Report of the last generation profiled with the "Profile Script Generation" setting
+    def __init__(self, profile, parent=None):
+        super().__init__(parent)
+
+        self.setWindowTitle(Traduction.get_trad("emit_profile", "Generation Profile"))
+        self.resize(720, 560)
+        self.setStyleSheet(f"""
+            QDialog {{
+                background-color: {Theme.BACKGROUND};
+            }}
+            QLabel {{
+                background: transparent;
+                color: {Theme.TEXT};
+            }}
+        """)
+
+        root = QVBoxLayout(self)
+
+        if profile is None:
+            label = QLabel(Traduction.get_trad(
+                "emit_profile_empty",
+                "Nothing profiled yet. Enable \"Profile Script Generation\" in the settings and generate the script."
+            ))
+            label.setWordWrap(True)
+            root.addWidget(label)
+            return
+
+        root.addWidget(QLabel(Traduction.get_trad(
+            "emit_profile_summary",
+            f"{len(profile.by_node)} nodes in {profile.total * 1e3:.1f} ms",
+            count=len(profile.by_node),
+            ms=f"{profile.total * 1e3:.1f}"
+        )))
+
+        calls = Traduction.get_trad("emit_profile_calls", "Calls")
+        cumulative = Traduction.get_trad("emit_profile_cumulative", "Cumulative (ms)")
+        own = Traduction.get_trad("emit_profile_self", "Self (ms)")
+
+        root.addWidget(QLabel(Traduction.get_trad("emit_profile_by_type", "By node type")))
+        root.addWidget(self._table(
+            [Traduction.get_trad("emit_profile_type", "Type"), calls, cumulative, own],
+            [(node_type, n, c, s) for node_type, n, c, s in profile.type_rows()]
+        ))
+
+        root.addWidget(QLabel(Traduction.get_trad("emit_profile_by_node", "Slowest nodes")))
+        root.addWidget(self._table(
+            [Traduction.get_trad("emit_profile_node", "Node"), calls, cumulative, own],
+            [(f"{title} #{node_id}", n, c, s) for node_id, _, title, n, c, s in profile.node_rows()]
+        ))
+
+    def _table(self, headers, rows):
+        table = QTableWidget(len(rows), len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        for row, (name, calls, cumulative, own) in enumerate(rows):
+            cells = [name, str(calls), f"{cumulative * 1e3:.2f}", f"{own * 1e3:.2f}"]
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(row, column, item)
+        return table
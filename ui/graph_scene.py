@@ -34,6 +34,7 @@ class GraphScene(QGraphicsScene):                                          #TODO
     connection_created = Signal(object, object)
     graph_changed = Signal()
     auto_save_triggered = Signal()
+    node_moved = Signal(object)
 
     def __init__(self, graph):
         super().__init__()
@@ -63,6 +63,10 @@ class GraphView(QGraphicsView):
         super().__init__()
         self.graph = graph
         self.editor = editor
+        # function bodies saved apart are read once the view reaches them
+        self._body_timer = QTimer(self)
+        self._body_timer.setSingleShot(True)
+        self._body_timer.timeout.connect(self.load_visible_bodies)
         self.graph_scene = GraphScene(self.graph)
         self.setScene(self.graph_scene)
         self.graph_scene.setSceneRect(-50000, -50000, 100000, 100000)
@@ -199,6 +203,25 @@ class GraphView(QGraphicsView):
         self.node_items[node.id] = node_item
         return node_item
 
+    def _schedule_body_loading(self):
+        store = self.graph.function_store
+        if store is not None and store.pending:
+            self._body_timer.start(0)
+
+    def load_visible_bodies(self):
+        store = self.graph.function_store
+        if store is None or not store.pending:
+            return
+        visible = self.mapToScene(self.viewport().rect()).boundingRect()
+        for uuid, (x0, y0, x1, y1) in list(store.pending_rects()):
+            # positions are the top left corner of the nodes
+            if visible.intersects(QRectF(QPointF(x0, y0), QPointF(x1, y1)).adjusted(-50, -50, 300, 250)):
+                store.load(uuid)
+
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self._schedule_body_loading()
+
     def wheelEvent(self, event):
         zoom_step = 1.15
         min_scale = 0.2
@@ -303,6 +326,7 @@ class GraphView(QGraphicsView):
 
             return
         if event.matches(QKeySequence.SelectAll): # Ctrl+A
+            self.graph.ensure_loaded()
             self.scene().clearSelection()
             for item in self.scene().items():
                 if isinstance(item, NodeItem):
@@ -422,6 +446,7 @@ class GraphView(QGraphicsView):
         self.undo_stack.push(AddCommentCommand(self, box))
 
     def frame_all(self):
+        self.graph.ensure_loaded()
         rect = self.scene().itemsBoundingRect()
         if rect.isNull():
             return
@@ -522,6 +547,7 @@ class GraphView(QGraphicsView):
             Debug.Log(f"Pasted {len(nodes_data)} nodes")
 
     def auto_layout(self):
+        self.graph.ensure_loaded()
         l = GraphLayoutEngine(self.graph)
         positions = l.compute()
 
@@ -588,6 +614,7 @@ class GraphView(QGraphicsView):
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
+        self._schedule_body_loading()
         if hasattr(self, "zoom_widget"):
             self.zoom_widget.move(10, self.height() - 42)
         if hasattr(self, "frame_btn"):
@@ -629,6 +656,7 @@ class GraphView(QGraphicsView):
 
         self.setTransformationAnchor(old_transform_anchor)
         self.setResizeAnchor(old_resize_anchor)
+        self._schedule_body_loading()
 
     def _on_zoom_slider_changed(self, value):
         self.set_zoom(value / 100.0)
@@ -706,6 +734,7 @@ class GraphView(QGraphicsView):
         self.zoom_slider.blockSignals(True)
         self.zoom_slider.setValue(slider_value)
         self.zoom_slider.blockSignals(False)
+        self._schedule_body_loading()
 
     def _open_palette_from_selected(self, node_item):
         scene_pos = node_item.sceneBoundingRect().center()
@@ -763,6 +792,7 @@ class GraphView(QGraphicsView):
         self.close_node_palette()
 
     def rebuild_graph(self):
+        self.graph.ensure_loaded()
         for item in self.scene().items():
             if isinstance(item, NodeItem):
                 item.setSelected(True)
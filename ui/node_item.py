@@ -103,12 +103,12 @@ class NodeItem(QGraphicsItem):
 
     def itemChange(self, change, value):
         if change == QGraphicsItem.ItemPositionHasChanged:
+            self.node.x = value.x()
+            self.node.y = value.y()
             scene = self.scene()
             if scene:
                 scene.update_edges_for_node(self)
-                self.scene().auto_save_triggered.emit()
-            self.node.x = value.x()
-            self.node.y = value.y()
+                scene.node_moved.emit(self.node)
 
         elif change == QGraphicsItem.ItemSelectedChange and value:
             scene = self.scene()
@@ -119,7 +119,7 @@ class NodeItem(QGraphicsItem):
 
         return super().itemChange(change, value)
 
-    def get_port_scene_pos(self, port_id: str) -> QPointF:
+    def get_port_scene_pos(self, port_id: int) -> QPointF:
         if port_id in self.port_items:
             port_item = self.port_items[port_id]
             return self.mapToScene(port_item.pos())
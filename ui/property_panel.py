@@ -67,6 +67,8 @@ class PropertyPanel(QWidget):
     def _update_property(self, key, value):
         if self.current_node:
             self.current_node.properties[key] = value
+            if self.graph_view:
+                self.graph_view.graph.mark_dirty(self.current_node.id)
 
     def _run_dynamic(self, key):
         if not self.current_node:
@@ -77,6 +79,7 @@ class PropertyPanel(QWidget):
 
         if callable(func):
             func()
+            self.graph_view.graph.mark_dirty(self.current_node.id)
 
             node_item = self.graph_view.node_items.get(self.current_node.id)
             if node_item:
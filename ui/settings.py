@@ -28,7 +28,7 @@ from PySide6.QtGui import QPainter, QColor, QPalette
 from core.config import Config, ConfigManager
 from core.traduction import Traduction
 from theme.theme import set_dark_theme, set_purple_theme, set_white_theme, Theme
-from theme.theme_parser import load_theme, import_theme, delete_theme, theme_list, BUILTIN_THEMES, _themes_dir, parse_yaml
+from theme.theme_parser import load_theme, load_every_theme, import_theme, delete_theme, theme_list, BUILTIN_THEMES, _themes_dir, parse_yaml
 from ui.menu_style import apply_menu_style, apply_btn_style
 from core.debug import Debug, Info
 from core.logger import Logger
@@ -241,6 +241,8 @@ class SettingsDialog(QDialog):
             ("using_tty", "Use TTY", "USING_TTY"),
             ("sync_nodes_and_gen", "Sync Nodes and Generation", "SYNC_NODES_AND_GEN"),
             ("auto_save", "Auto Save", "AUTO_SAVE"),
+            ("optimize_script", "Optimize Generated Script", "OPTIMIZE_SCRIPT"),
+            ("profile_emit", "Profile Script Generation", "PROFILE_EMIT"),
         ]:
             row, label = create_switch_row(key, fallback, attr)
             switch = row.itemAt(row.count() - 1).widget()  #  get the switch we just created
@@ -259,6 +261,7 @@ class SettingsDialog(QDialog):
         self.root_layout.addLayout(footer)
 
     def _populate_theme_combo(self):
+        load_every_theme()
         self.theme_combo.clear()
         builtin_labels = {
             "dark": ("theme_dark", "Dark"),
@@ -399,6 +402,8 @@ class SettingsDialog(QDialog):
             ("using_tty", "using_tty", "Use TTY"),
             ("sync_nodes_and_gen", "sync_nodes_and_gen", "Sync Nodes and Generation"),
             ("auto_save", "auto_save", "Auto Save"),
+            ("optimize_script", "optimize_script", "Optimize Generated Script"),
+            ("profile_emit", "profile_emit", "Profile Script Generation"),
         ]:
             label = getattr(self, f"{attr}_label", None)
             if label: